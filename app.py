@@ -1,18 +1,70 @@
-from flask import Flask, redirect, url_for, flash, session, render_template, request, jsonify
+from flask import Flask, redirect, url_for, flash, session, render_template, request, jsonify, Response, stream_with_context, g
+from flask import before_render_template, template_rendered
 from flask_sqlalchemy import SQLAlchemy
 import os
-import requests
 import json
 from datetime import datetime, timedelta
 from flask_login import LoginManager, login_required, UserMixin, current_user, login_user, logout_user
-import database_india 
-import database_europe 
-import database_usa 
 import random 
+import threading
+import time
 import finviserAI 
-import yfinance as yf
+from data_cache import company_db_cache
+from quote_cache import quote_cache
+from ohlc_store import PERIODS, ohlc_store
+from quote_stream import STREAM_HEARTBEAT_SECONDS, STREAM_RETRY_MS, WSGI_STREAM_MAX_SECONDS, quote_fields, quote_hub
+from fetch_engine import fetch_concurrently
+from symbol_resolver import SymbolLookupUnavailable, symbol_resolver
+from market_provider import MarketDataNotFound
+import market_refresher
+import snapshot_store
+from lazy_imports import lazy_module, preload
+from formatting import USD_PER_BILLION, format_usd
+import metrics
+
+# Loaded on first use so pages that never touch market data (home, about,
+# login) do not pay for pandas and NumPy at worker boot
+region_engine = lazy_module("region_engine")
+chart_series = lazy_module("chart_series")
+screener = lazy_module("screener")
+symbol_search = lazy_module("symbol_search")
+
+# Set to "1" to import the heavy modules up front instead, e.g. under
+# gunicorn --preload so forked workers inherit them already loaded
+PRELOAD_MODULES = os.getenv("FINVISER_PRELOAD_MODULES", "0") == "1"
+
+if PRELOAD_MODULES:
+    preload("pandas", "numpy", "region_engine", "screener", "symbol_search", "recommendation_engine", "google.generativeai")
+
 app = Flask(__name__)
 app.secret_key = "finviser"
+# Market caps stay numeric until rendered, e.g. {{ company.market_cap_usd | usd(display_unit) }}
+app.add_template_filter(format_usd, 'usd')
+
+
+# Every route and template render is timed into the /metrics histograms
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_time(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        metrics.record_request(request.method, route, request.path, response.status_code,
+                               time.perf_counter() - started)
+    return response
+
+@before_render_template.connect_via(app)
+def start_template_timer(sender, template, context, **extra):
+    g.setdefault('template_timers', []).append(time.perf_counter())
+
+@template_rendered.connect_via(app)
+def record_template_time(sender, template, context, **extra):
+    timers = g.get('template_timers')
+    if timers:
+        metrics.template_seconds.observe(time.perf_counter() - timers.pop(), template=template.name)
 
 
 instance_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance')
@@ -36,6 +88,40 @@ class User(db.Model, UserMixin):
         self.email = email
         self.password = password
 
+_background_lock = threading.Lock()
+_background_started = False
+
+
+def start_background_work():
+    """
+    Primes the caches from the last snapshot and starts the background
+    refresher, once per process. Runs on the first request rather than at
+    import, so importing app (a worker boot, a script, a forking server's
+    master) starts no threads; call it directly to start earlier.
+    """
+    global _background_started
+    if _background_started:
+        return
+    with _background_lock:
+        if _background_started:
+            return
+        # Serve the last persisted market data immediately after a restart
+        if snapshot_store.SNAPSHOTS_ENABLED:
+            snapshot_store.install(snapshot_store.SnapshotStore())
+        # Keep regional databases and requested quotes warm off the request threads
+        if market_refresher.BACKGROUND_REFRESH:
+            market_refresher.market_refresher.start()
+        _background_started = True
+
+
+def background_work_started():
+    return _background_started
+
+
+@app.before_request
+def start_background_work_on_first_request():
+    start_background_work()
+
 login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = 'login'
@@ -48,28 +134,31 @@ def load_user(user_id):
 def home():
     return render_template("home.html")
 
+# Companies shown per market-cap column on one dashboard page
+DASHBOARD_PAGE_SIZE = int(os.getenv("FINVISER_DASHBOARD_PAGE_SIZE", "25"))
+
 @app.route("/dashboard")
 def dashboard():
     company_data_categorized = {"Small Cap": [], "Mid Cap": [], "Large Cap": []}
     selected_region = session.get('selected_region', 'NA') # Default to NA
-
-    if selected_region == 'INDIA':
-        company_db = database_india.get_company_database()
-        company_data_categorized["Small Cap"] = [{'name': c["name"], 'ticker': c["ticker"], 'market_cap': c["market_cap"]} for c in company_db["Small Cap"]]
-        company_data_categorized["Mid Cap"] = [{'name': c["name"], 'ticker': c["ticker"], 'market_cap': c["market_cap"]} for c in company_db["Mid Cap"]]
-        company_data_categorized["Large Cap"] = [{'name': c["name"], 'ticker': c["ticker"], 'market_cap': c["market_cap"]} for c in company_db["Large Cap"]]
-    elif selected_region == 'EUROPE':
-        company_db = database_europe.get_company_database()
-        company_data_categorized["Small Cap"] = [{'name': c["name"], 'ticker': c["ticker"], 'market_cap': c["market_cap"]} for c in company_db["Small Cap"]]
-        company_data_categorized["Mid Cap"] = [{'name': c["name"], 'ticker': c["ticker"], 'market_cap': c["market_cap"]} for c in company_db["Mid Cap"]]
-        company_data_categorized["Large Cap"] = [{'name': c["name"], 'ticker': c["ticker"], 'market_cap': c["market_cap"]} for c in company_db["Large Cap"]]
-    elif selected_region == 'NA':
-        company_db = database_usa.get_company_database()
-        company_data_categorized["Small Cap"] = [{'name': c["name"], 'ticker': c["ticker"], 'market_cap': c["market_cap"]} for c in company_db["Small Cap"]]
-        company_data_categorized["Mid Cap"] = [{'name': c["name"], 'ticker': c["ticker"], 'market_cap': c["market_cap"]} for c in company_db["Mid Cap"]]
-        company_data_categorized["Large Cap"] = [{'name': c["name"], 'ticker': c["ticker"], 'market_cap': c["market_cap"]} for c in company_db["Large Cap"]]
-                
-    return render_template("dashboard.html", company_data_categorized=company_data_categorized, selected_region=selected_region)
+    page = max(request.args.get('page', 1, type=int), 1)
+    total_pages = 1
+    region = region_engine.get_region(selected_region)
+    display_unit = region.display_unit if region else USD_PER_BILLION
+
+    company_db = get_region_company_database(selected_region)
+    if company_db:
+        # Full-exchange universes hold thousands of companies; only one page
+        # of each column is rendered
+        longest = max(len(company_db.get(category, [])) for category in company_data_categorized)
+        total_pages = max(1, -(-longest // DASHBOARD_PAGE_SIZE))
+        page = min(page, total_pages)
+        start = (page - 1) * DASHBOARD_PAGE_SIZE
+        for category in company_data_categorized:
+            company_data_categorized[category] = company_db.get(category, [])[start:start + DASHBOARD_PAGE_SIZE]
+
+    return render_template("dashboard.html", company_data_categorized=company_data_categorized, selected_region=selected_region,
+                           page=page, total_pages=total_pages, display_unit=display_unit)
 
 @app.route('/set_region', methods=['POST'])
 def set_region():
@@ -79,22 +168,22 @@ def set_region():
         return jsonify(success=True, selected_region=region)
     return jsonify(success=False, message='No region provided'), 400
 
+def get_region_company_database(region):
+    """
+    Returns the cached company database for a region key ("USA") or the
+    dashboard's session value ("NA"), or {} for an unknown region.
+    """
+    known = region_engine.get_region(region)
+    return region_engine.get_company_database(known.key) if known else {}
+
+
 @app.route("/api/ai_recommendations", methods=["POST"])
 def get_ai_recommendations():
     if request.method == "POST":
         preferences = request.json
         region = preferences.get('region')
 
-        company_database = {}
-        if region == "USA":
-            from database_usa import get_company_database
-            company_database = get_company_database()
-        elif region == "EU":
-            from database_europe import get_company_database
-            company_database = get_company_database()
-        elif region == "INDIA":
-            from database_india import get_company_database
-            company_database = get_company_database()
+        company_database = get_region_company_database(region)
 
         if not company_database:
             return jsonify(success=False, message="Could not retrieve company data for the selected region."), 400
@@ -105,94 +194,122 @@ def get_ai_recommendations():
     return jsonify(success=False, message="Invalid request method."), 400
 
 
-@app.route("/api/stock/<ticker>")
-def get_stock_data(ticker):
-    period = request.args.get('period', '1M')
-    ticker_upper = ticker.upper()
-
-    # Special handling for TCS (India)
-    if ticker_upper == 'TCS':
-        # Try NSE:TCS first, fallback to BSE:TCS
-        for tcs_ticker in ['TCS.NS', 'TCS.BO']:
-            try:
-                stock = yf.Ticker(tcs_ticker)
-                info = stock.info
-                hist = stock.history(period='1mo')
-                price_inr = info.get('regularMarketPrice')
-                previous_close_inr = info.get('regularMarketPreviousClose')
-                change_inr = None
-                change_percent = None
-                if price_inr is not None and previous_close_inr is not None:
-                    change_inr = price_inr - previous_close_inr
-                    change_percent = (change_inr / previous_close_inr) * 100 if previous_close_inr != 0 else 0
-                market_cap_inr = info.get('marketCap')
-                volume = info.get('volume')
-                high_52w_inr = info.get('fiftyTwoWeekHigh')
-                low_52w_inr = info.get('fiftyTwoWeekLow')
-                name = info.get('shortName', 'Tata Consultancy Services')
-                currency = info.get('currency', 'INR')
-
-                # Fetch INR to USD exchange rate
-                try:
-                    fx_resp = requests.get('https://api.exchangerate.host/latest?base=INR&symbols=USD', timeout=5)
-                    fx_data = fx_resp.json()
-                    inr_usd = fx_data['rates']['USD'] if 'rates' in fx_data and 'USD' in fx_data['rates'] else 0.012
-                except Exception as fx_e:
-                    print(f"Error fetching INR to USD rate: {fx_e}")
-                    inr_usd = 0.012  # fallback
-
-                # Convert all INR values to USD
-                price = round(price_inr * inr_usd, 2) if price_inr else 0
-                previous_close = round(previous_close_inr * inr_usd, 2) if previous_close_inr else 0
-                change = round(change_inr * inr_usd, 2) if change_inr else 0
-                market_cap = round(market_cap_inr * inr_usd, 2) if market_cap_inr else 0
-                high_52w = round(high_52w_inr * inr_usd, 2) if high_52w_inr else 0
-                low_52w = round(low_52w_inr * inr_usd, 2) if low_52w_inr else 0
-
-                history_prices = hist['Close'].tolist() if 'Close' in hist else []
-                history_prices_usd = [round(p * inr_usd, 2) for p in history_prices] if history_prices else ([price] * 30 if price else [])
-
-                data = {
-                    'name': name,
-                    'price': price,
-                    'change': change,
-                    'changePercent': change_percent if change_percent else 0,
-                    'marketCap': market_cap,
-                    'volume': volume if volume else 0,
-                    'high52w': high_52w,
-                    'low52w': low_52w,
-                    'history': history_prices_usd,
-                    'currency': 'USD'
-                }
-                return jsonify(success=True, data=data)
-            except Exception as e:
-                print(f"Error fetching TCS data from {tcs_ticker}: {e}")
-        return jsonify(success=False, message='Stock data not found for TCS.'), 404
+def sse_event(event, payload):
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+
+@app.route("/api/ai_recommendations/stream", methods=["POST"])
+def stream_ai_recommendations():
+    """
+    Same request body as /api/ai_recommendations, but the markdown answer is
+    sent as Server-Sent Events while Gemini generates it: one "chunk" event
+    per piece of text, then a final "done" event.
+    """
+    preferences = request.json
+    company_database = get_region_company_database(preferences.get('region'))
+
+    if not company_database:
+        return jsonify(success=False, message="Could not retrieve company data for the selected region."), 400
+
+    def events():
+        for text in finviserAI.generate_recommendations_stream(preferences, company_database):
+            yield sse_event("chunk", {"text": text})
+        yield sse_event("done", {"success": True})
+
+    return Response(stream_with_context(events()), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+# Chart points returned per history unless ?points= asks for fewer or more
+CHART_POINTS = int(os.getenv("FINVISER_CHART_POINTS", "500"))
+
+# Upper bound on ?points=, so no period can produce an unbounded payload
+MAX_CHART_POINTS = int(os.getenv("FINVISER_MAX_CHART_POINTS", "5000"))
+
+# A ticker with no bars is charted as this many points at its current price,
+# one bar interval apart and ending now
+FALLBACK_CHART_POINTS = 30
+BAR_INTERVAL_MS = {"5m": 5 * 60_000, "1h": 60 * 60_000, "1d": 24 * 60 * 60_000}
+
+
+def parse_history_options(args):
+    """
+    Reads the history query parameters shared by /api/stock and /api/stocks:
+    period (see ohlc_store.PERIODS), points, downsample (lttb or minmax) and
+    encoding (json or binary). Raises ValueError with a user-facing message.
+    """
+    period = args.get('period', '1M').upper()
+    if period not in PERIODS:
+        raise ValueError(f"Unknown period. Use one of: {', '.join(PERIODS)}.")
+    try:
+        points = int(args.get('points', CHART_POINTS))
+    except ValueError:
+        raise ValueError('points must be a whole number.') from None
+    if not 2 <= points <= MAX_CHART_POINTS:
+        raise ValueError(f'points must be between 2 and {MAX_CHART_POINTS}.')
+    method = args.get('downsample', 'lttb').lower()
+    if method not in chart_series.METHODS:
+        raise ValueError(f"Unknown downsample method. Use one of: {', '.join(chart_series.METHODS)}.")
+    encoding = args.get('encoding', 'json').lower()
+    if encoding not in chart_series.ENCODINGS:
+        raise ValueError(f"Unknown encoding. Use one of: {', '.join(chart_series.ENCODINGS)}.")
+    return {'period': period, 'points': points, 'method': method, 'encoding': encoding}
+
+
+def fetch_stock_payload(ticker_upper, period='1M', points=CHART_POINTS, method='lttb', encoding='json'):
+    """
+    Builds the /api/stock payload for a single ticker, with the price history
+    of `period` (a key of ohlc_store.PERIODS) downsampled to at most `points`.
+    Raises LookupError with a user-facing message when no data is found, and
+    SymbolLookupUnavailable when Yahoo Finance could not be asked.
+    """
+    unavailable = 'Market data is temporarily unavailable. Please try again.'
+    try:
+        # Resolve the bare ticker to its exchange-qualified symbol (e.g. TCS -> TCS.NS)
+        symbol, info = symbol_resolver.resolve(ticker_upper)
+    except LookupError as e:
+        print(f"Error resolving {ticker_upper}: {e}")
+        raise LookupError('Stock data not found.') from e
+    except SymbolLookupUnavailable as e:
+        print(f"Error resolving {ticker_upper}: {e}")
+        raise SymbolLookupUnavailable(unavailable) from e
+    market_refresher.market_refresher.track(symbol)
+
+    try:
+        bars = ohlc_store.get_bars(symbol, period)
+    except MarketDataNotFound as e:
+        print(f"No price history for {symbol}: {e}")
+        raise LookupError('Stock data not found.') from e
+    except Exception as e:
+        # Only a first fetch raises; stored bars are served through outages
+        print(f"Error fetching price history for {symbol}: {e}")
+        raise SymbolLookupUnavailable(unavailable) from e
 
     try:
-        stock = yf.Ticker(ticker_upper)
-        info = stock.info
-        hist = stock.history(period='1mo')
-        price = info.get('regularMarketPrice')
-        previous_close = info.get('regularMarketPreviousClose')
-        change = None
-        change_percent = None
-        if price is not None and previous_close is not None:
-            change = price - previous_close
-            change_percent = (change / previous_close) * 100 if previous_close != 0 else 0
-        market_cap = info.get('marketCap')
-        volume = info.get('volume')
+        quote = quote_fields(info)
+        price = quote['price']
+        change = quote['change']
+        change_percent = quote['changePercent']
+        market_cap = quote['marketCap']
+        volume = quote['volume']
         high_52w = info.get('fiftyTwoWeekHigh')
         low_52w = info.get('fiftyTwoWeekLow')
         name = info.get('shortName', ticker_upper)
         currency = info.get('currency', 'USD')
 
-        # Prepare history for chart (close prices)
-        history_prices = hist['Close'].tolist() if 'Close' in hist else []
-        if not history_prices:
-            history_prices = [price] * 30 if price else []
+        # Prepare history for chart (close prices and their times in epoch milliseconds)
+        history_prices = bars['Close'].to_numpy()
+        timestamps = bars.index.asi8 // 1_000_000
+        if len(history_prices):
+            timestamps, history_prices = chart_series.downsample(timestamps, history_prices, points, method)
+        else:
+            history_prices = [price] * min(points, FALLBACK_CHART_POINTS) if price else []
+            step = BAR_INTERVAL_MS[PERIODS[period][0]]
+            now_ms = int(time.time() * 1000)
+            timestamps = [now_ms - step * i for i in range(len(history_prices) - 1, -1, -1)]
+        timestamps, history_prices = chart_series.encode(timestamps, history_prices, encoding)
 
-        data = {
+        return {
             'name': name,
             'price': price if price else 0,
             'change': change if change else 0,
@@ -202,13 +319,178 @@ def get_stock_data(ticker):
             'high52w': high_52w if high_52w else 0,
             'low52w': low_52w if low_52w else 0,
             'history': history_prices,
+            'timestamps': timestamps,
+            'period': period,
+            'bars': len(bars),
+            'encoding': encoding,
             'currency': currency
         }
-        return jsonify(success=True, data=data)
     except Exception as e:
         print(f"Error fetching real-time data: {e}")
+        raise LookupError('Stock data not found.') from e
+
+
+@app.route("/api/stock/<ticker>")
+def get_stock_data(ticker):
+    try:
+        options = parse_history_options(request.args)
+    except ValueError as e:
+        return jsonify(success=False, message=str(e)), 400
+    try:
+        data = fetch_stock_payload(ticker.upper(), **options)
+    except LookupError as e:
+        return jsonify(success=False, message=str(e)), 404
+    except SymbolLookupUnavailable as e:
+        return jsonify(success=False, message=str(e)), 503
+    return jsonify(success=True, data=data)
+
+
+# Upper bound on tickers accepted by one /api/stocks or /api/quotes/stream request
+MAX_BULK_TICKERS = 50
+
+
+def parse_tickers(values):
+    """
+    Upper-cased, de-duplicated tickers from ?tickers=AAPL,MSFT&tickers=TCS.
+    """
+    raw = ','.join(values)
+    return list(dict.fromkeys(t.strip().upper() for t in raw.split(',') if t.strip()))
+
+
+@app.route("/api/stocks")
+def get_bulk_stock_data():
+    """
+    Returns the /api/stock payload for many tickers in one round-trip, e.g.
+    /api/stocks?tickers=AAPL,MSFT,TCS&period=1Y&points=200. Tickers are
+    fetched concurrently and failures are reported per ticker instead of
+    failing the whole request.
+    """
+    tickers = parse_tickers(request.args.getlist('tickers'))
+    if not tickers:
+        return jsonify(success=False, message='No tickers provided.'), 400
+    if len(tickers) > MAX_BULK_TICKERS:
+        return jsonify(success=False, message=f'At most {MAX_BULK_TICKERS} tickers per request.'), 400
+    try:
+        options = parse_history_options(request.args)
+    except ValueError as e:
+        return jsonify(success=False, message=str(e)), 400
+
+    results = fetch_concurrently(
+        tickers,
+        lambda t: {'success': True, 'data': fetch_stock_payload(t, **options)},
+        lambda t, e: {'success': False,
+                      'message': str(e) if isinstance(e, (LookupError, SymbolLookupUnavailable)) else 'Stock data not found.'},
+    )
+    return jsonify(success=True, data=dict(zip(tickers, results)))
+
+
+def resolve_stream_symbols(tickers):
+    """
+    Resolves tickers concurrently; returns ({symbol: ticker}, unknown tickers).
+    """
+    symbols = fetch_concurrently(tickers, lambda t: symbol_resolver.resolve(t)[0], lambda t, e: None)
+    resolved = {symbol: ticker for ticker, symbol in zip(tickers, symbols) if symbol is not None}
+    return resolved, [ticker for ticker, symbol in zip(tickers, symbols) if symbol is None]
+
+
+@app.route("/api/quotes/stream")
+def stream_quotes():
+    """
+    Live quotes as Server-Sent Events, e.g. /api/quotes/stream?tickers=AAPL,TCS.
+    Each "quote" event is {ticker: changed fields}; a ticker's first event
+    carries every field. Tickers that cannot be resolved are listed once in
+    an "unknown" event. Quotes are polled once per ticker for all clients.
+
+    Each stream holds a worker thread, so it ends after
+    WSGI_STREAM_MAX_SECONDS and the EventSource reconnects, starting again
+    with every field. asgi.py serves this route without the cut.
+    """
+    tickers = parse_tickers(request.args.getlist('tickers'))
+    if not tickers:
+        return jsonify(success=False, message='No tickers provided.'), 400
+    if len(tickers) > MAX_BULK_TICKERS:
+        return jsonify(success=False, message=f'At most {MAX_BULK_TICKERS} tickers per request.'), 400
+    symbols, unknown = resolve_stream_symbols(tickers)
+    if not symbols:
         return jsonify(success=False, message='Stock data not found.'), 404
- 
+
+    def events():
+        deadline = time.monotonic() + WSGI_STREAM_MAX_SECONDS
+        yield f"retry: {STREAM_RETRY_MS}\n\n"
+        if unknown:
+            yield sse_event("unknown", {"tickers": unknown})
+        subscription = quote_hub.subscribe(symbols)
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                updates = subscription.next(min(STREAM_HEARTBEAT_SECONDS, remaining))
+                yield sse_event("quote", updates) if updates else ": keep-alive\n\n"
+        finally:
+            subscription.close()
+
+    return Response(events(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@app.route("/api/screen")
+def screen_companies():
+    """
+    Filters and sorts the cached regional universes, e.g.
+    /api/screen?region=USA,INDIA&tier=large&min_cap=50B&min_change=2&sort=change.
+    See screener.parse_screen_options for every parameter. Only cached data is
+    screened; regions that are still loading are listed in pending_regions.
+    """
+    try:
+        options = screener.parse_screen_options(request.args)
+    except ValueError as e:
+        return jsonify(success=False, message=str(e)), 400
+    return jsonify(success=True, **screener.screen(options))
+
+
+@app.route("/api/search")
+def search_symbols():
+    """
+    Typeahead over every region's tickers and company names, e.g.
+    /api/search?q=moet&limit=5. Matching ignores case and accents.
+    """
+    try:
+        limit = int(request.args.get('limit', symbol_search.SEARCH_LIMIT))
+    except ValueError:
+        return jsonify(success=False, message='limit must be a whole number.'), 400
+    if not 1 <= limit <= symbol_search.MAX_SEARCH_LIMIT:
+        return jsonify(success=False, message=f'limit must be between 1 and {symbol_search.MAX_SEARCH_LIMIT}.'), 400
+    query = request.args.get('q', '')
+    return jsonify(success=True, query=query, results=symbol_search.search(query, limit))
+
+
+@app.route("/api/cache_stats")
+def get_cache_stats():
+    return jsonify(success=True, quote_cache=quote_cache.stats(), company_db_cache=company_db_cache.stats(),
+                   ohlc_store=ohlc_store.stats(), quote_stream=quote_hub.stats(),
+                   recommendation_cache=finviserAI.recommendation_cache.stats())
+
+
+@app.route("/metrics")
+def prometheus_metrics():
+    """
+    Route, upstream-call, region-build and template latency histograms plus
+    the cache counters, in the Prometheus text format.
+    """
+    stats = {
+        "quote_cache": quote_cache.stats(),
+        "company_db_cache": company_db_cache.stats(),
+        "ohlc_store": ohlc_store.stats(),
+        "quote_stream": quote_hub.stats(),
+        "recommendation_cache": finviserAI.recommendation_cache.stats(),
+    }
+    return Response(metrics.render(stats), content_type=metrics.CONTENT_TYPE)
+
+
+@app.route("/api/refresh_stats")
+def get_refresh_stats():
+    return jsonify(success=True, refresher=market_refresher.market_refresher.metrics())
 
 
 @app.route("/signup", methods=["GET", "POST"])
@@ -0,0 +1,262 @@
+"""
+ASGI entry point: `uvicorn asgi:application`.
+
+The upstream-bound endpoints (/api/stock/<ticker>, /api/stocks,
+/api/ai_recommendations and /dashboard) are served as coroutines, so a request
+waiting on Yahoo Finance or Gemini holds no worker thread and one process can
+keep hundreds of upstream calls in flight. /api/quotes/stream is served the
+same way, so an open quote stream costs no thread either. Every other route
+is handed to the Flask app unchanged.
+"""
+import asyncio
+import json
+import time
+from http.cookies import SimpleCookie
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from asgiref.wsgi import WsgiToAsgi
+
+import app as flask_module
+import finviserAI
+import metrics
+from async_support import close_http_client, run_blocking
+from fx_rates import fx_service
+from quote_stream import STREAM_HEARTBEAT_SECONDS, STREAM_RETRY_MS, quote_hub
+from symbol_resolver import SymbolLookupUnavailable
+
+flask_app = flask_module.app
+wsgi_application = WsgiToAsgi(flask_app)
+
+
+async def read_body(receive) -> bytes:
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            return body
+
+
+async def send_json(send, payload: Dict[str, Any], status: int = 200) -> None:
+    body = json.dumps(payload).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+def query_params(scope) -> Dict[str, List[str]]:
+    return parse_qs(scope.get("query_string", b"").decode("latin-1"))
+
+
+def session_region(scope) -> str:
+    """
+    Reads selected_region from Flask's signed session cookie.
+    """
+    cookies = SimpleCookie()
+    for name, value in scope.get("headers", []):
+        if name == b"cookie":
+            cookies.load(value.decode("latin-1"))
+    morsel = cookies.get(flask_app.config.get("SESSION_COOKIE_NAME", "session"))
+    if morsel is None:
+        return 'NA'
+    serializer = flask_app.session_interface.get_signing_serializer(flask_app)
+    try:
+        return serializer.loads(morsel.value).get('selected_region', 'NA')
+    except Exception:
+        return 'NA'
+
+
+def history_options(scope) -> Dict[str, Any]:
+    """
+    The period/points/downsample/encoding options of the query string; raises
+    ValueError like app.parse_history_options.
+    """
+    return flask_module.parse_history_options({name: values[0] for name, values in query_params(scope).items()})
+
+
+async def stock_payload(ticker: str, options: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
+    """
+    The /api/stock result for ticker and the status it would be served with.
+    """
+    try:
+        return {'success': True, 'data': await run_blocking(flask_module.fetch_stock_payload, ticker, **options)}, 200
+    except LookupError as e:
+        return {'success': False, 'message': str(e)}, 404
+    except SymbolLookupUnavailable as e:
+        return {'success': False, 'message': str(e)}, 503
+
+
+async def get_stock_data(scope, receive, send, ticker: str) -> None:
+    try:
+        options = history_options(scope)
+    except ValueError as e:
+        return await send_json(send, {'success': False, 'message': str(e)}, 400)
+    result, status = await stock_payload(ticker.upper(), options)
+    await send_json(send, result, status)
+
+
+async def get_bulk_stock_data(scope, receive, send) -> None:
+    tickers = flask_module.parse_tickers(query_params(scope).get('tickers', []))
+    if not tickers:
+        return await send_json(send, {'success': False, 'message': 'No tickers provided.'}, 400)
+    if len(tickers) > flask_module.MAX_BULK_TICKERS:
+        return await send_json(send, {'success': False,
+                                      'message': f'At most {flask_module.MAX_BULK_TICKERS} tickers per request.'}, 400)
+    try:
+        options = history_options(scope)
+    except ValueError as e:
+        return await send_json(send, {'success': False, 'message': str(e)}, 400)
+
+    results = await asyncio.gather(*(stock_payload(t, options) for t in tickers))
+    await send_json(send, {'success': True, 'data': {t: result for t, (result, _) in zip(tickers, results)}})
+
+
+async def wait_for_disconnect(receive) -> None:
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+async def stream_quotes(scope, receive, send) -> None:
+    tickers = flask_module.parse_tickers(query_params(scope).get('tickers', []))
+    if not tickers:
+        return await send_json(send, {'success': False, 'message': 'No tickers provided.'}, 400)
+    if len(tickers) > flask_module.MAX_BULK_TICKERS:
+        return await send_json(send, {'success': False,
+                                      'message': f'At most {flask_module.MAX_BULK_TICKERS} tickers per request.'}, 400)
+    symbols, unknown = await run_blocking(flask_module.resolve_stream_symbols, tickers)
+    if not symbols:
+        return await send_json(send, {'success': False, 'message': 'Stock data not found.'}, 404)
+
+    await send({
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [(b"content-type", b"text/event-stream"), (b"cache-control", b"no-cache"),
+                    (b"x-accel-buffering", b"no")],
+    })
+    # Tell EventSource how soon to reconnect, as the Flask stream does
+    await send({"type": "http.response.body", "body": f"retry: {STREAM_RETRY_MS}\n\n".encode(), "more_body": True})
+    if unknown:
+        event = flask_module.sse_event("unknown", {"tickers": unknown})
+        await send({"type": "http.response.body", "body": event.encode(), "more_body": True})
+    subscription = quote_hub.subscribe(symbols)
+    disconnected = asyncio.create_task(wait_for_disconnect(receive))
+    try:
+        while True:
+            # Stop as soon as the client leaves, not at the next heartbeat
+            waiting = asyncio.ensure_future(subscription.next_async(STREAM_HEARTBEAT_SECONDS))
+            await asyncio.wait({waiting, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+            if disconnected.done():
+                waiting.cancel()
+                return
+            updates = waiting.result()
+            event = flask_module.sse_event("quote", updates) if updates else ": keep-alive\n\n"
+            await send({"type": "http.response.body", "body": event.encode(), "more_body": True})
+    finally:
+        disconnected.cancel()
+        subscription.close()
+
+
+async def get_ai_recommendations(scope, receive, send) -> None:
+    try:
+        preferences = json.loads(await read_body(receive) or b"{}")
+    except ValueError:
+        preferences = None
+    if not isinstance(preferences, dict):
+        return await send_json(send, {'success': False, 'message': 'Invalid JSON body.'}, 400)
+
+    company_database = await run_blocking(flask_module.get_region_company_database, preferences.get('region'))
+    if not company_database:
+        return await send_json(send, {'success': False,
+                                      'message': 'Could not retrieve company data for the selected region.'}, 400)
+
+    recommendations = await finviserAI.generate_recommendations_async(preferences, company_database)
+    await send_json(send, {'success': True, 'recommendations': recommendations})
+
+
+async def dashboard(scope, receive, send) -> None:
+    # Warm the region's company database without holding a thread, then let
+    # Flask render the page from the cache
+    await run_blocking(flask_module.get_region_company_database, session_region(scope))
+    await wsgi_application(scope, receive, send)
+
+
+def match_route(method: str, path: str) -> Optional[tuple]:
+    if method == "GET" and path.startswith("/api/stock/") and len(path) > len("/api/stock/"):
+        return get_stock_data, (path[len("/api/stock/"):],)
+    if method == "GET" and path == "/api/stocks":
+        return get_bulk_stock_data, ()
+    if method == "GET" and path == "/api/quotes/stream":
+        return stream_quotes, ()
+    if method == "POST" and path == "/api/ai_recommendations":
+        return get_ai_recommendations, ()
+    if method == "GET" and path == "/dashboard":
+        return dashboard, ()
+    return None
+
+
+# Request-time histogram label of each coroutine route. /dashboard is left
+# out: the Flask app it hands over to times it.
+ROUTE_LABELS = {
+    get_stock_data: "/api/stock/<ticker>",
+    get_bulk_stock_data: "/api/stocks",
+    stream_quotes: "/api/quotes/stream",
+    get_ai_recommendations: "/api/ai_recommendations",
+}
+
+
+async def timed_handler(handler, route: str, scope, receive, send, *args) -> None:
+    """
+    Runs handler, recording the time until it starts its response, as the
+    Flask app does for its own routes.
+    """
+    started = time.perf_counter()
+
+    async def timed_send(message) -> None:
+        if message["type"] == "http.response.start":
+            metrics.record_request(scope["method"], route, scope["path"], message["status"],
+                                   time.perf_counter() - started)
+        await send(message)
+
+    await handler(scope, receive, timed_send, *args)
+
+
+async def refresh_fx_forever() -> None:
+    while True:
+        await fx_service.refresh_async()
+        await asyncio.sleep(fx_service.refresh_seconds)
+
+
+async def lifespan(scope, receive, send) -> None:
+    fx_task = None
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await run_blocking(flask_module.start_background_work)
+            fx_task = asyncio.create_task(refresh_fx_forever())
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            if fx_task is not None:
+                fx_task.cancel()
+            await close_http_client()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def application(scope, receive, send) -> None:
+    if scope["type"] == "lifespan":
+        return await lifespan(scope, receive, send)
+    if scope["type"] == "http":
+        # Done at lifespan startup; covers servers that skip lifespan
+        if not flask_module.background_work_started():
+            await run_blocking(flask_module.start_background_work)
+        route = match_route(scope["method"], scope["path"])
+        if route is not None:
+            handler, args = route
+            if handler in ROUTE_LABELS:
+                return await timed_handler(handler, ROUTE_LABELS[handler], scope, receive, send, *args)
+            return await handler(scope, receive, send, *args)
+    await wsgi_application(scope, receive, send)
@@ -0,0 +1,57 @@
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+
+# --- Configuration for the Async Request Path ---
+
+# Upstream calls allowed in flight at once per worker process. yfinance has no
+# async API, so its calls run on this many dedicated threads rather than
+# occupying request workers.
+UPSTREAM_CONCURRENCY = int(os.getenv("FINVISER_UPSTREAM_CONCURRENCY", "256"))
+
+# Seconds an async HTTP call may take before it is abandoned
+HTTP_TIMEOUT = float(os.getenv("FINVISER_HTTP_TIMEOUT", "5"))
+
+_executor: Optional[ThreadPoolExecutor] = None
+_http_client = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=UPSTREAM_CONCURRENCY, thread_name_prefix="finviser-upstream")
+    return _executor
+
+
+async def run_blocking(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Awaits a blocking upstream call (yfinance, the caches in front of it)
+    without blocking the event loop.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), functools.partial(fn, *args, **kwargs))
+
+
+def get_http_client():
+    """
+    Returns the process-wide httpx.AsyncClient. Connections are pooled and
+    kept alive across requests, up to UPSTREAM_CONCURRENCY at once.
+    """
+    global _http_client
+    if _http_client is None:
+        import httpx
+        _http_client = httpx.AsyncClient(
+            timeout=HTTP_TIMEOUT,
+            limits=httpx.Limits(max_connections=UPSTREAM_CONCURRENCY, max_keepalive_connections=32),
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
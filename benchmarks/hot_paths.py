@@ -0,0 +1,455 @@
+"""
+Offline benchmark of the data and recommendation hot paths.
+
+    python benchmarks/hot_paths.py [--json] [--output FILE] [--compare FILE] [--companies N] [bench ...]
+
+Benchmarks (all by default): company_database, api_stock, dashboard, prompt.
+
+Nothing touches the network. Market data comes from a deterministic synthetic
+provider over generated universes of --companies tickers per region, or,
+with --provider replay, from the recordings in fixtures/market_data (served
+by ReplayProvider over the repo's universes; refresh them by running the app
+with FINVISER_MARKET_PROVIDER=record). Gemini is replaced by a stub model, so the prompt benchmark
+measures only our side. --latency-ms adds a per-call sleep to the provider
+to imitate Yahoo's round trip.
+
+--json / --output write machine-readable results stamped with the commit;
+--compare prints the change against such a file and exits non-zero when a
+metric regressed by more than --threshold percent.
+"""
+import argparse
+import contextlib
+import csv
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BENCHMARKS = ("company_database", "api_stock", "dashboard", "prompt")
+
+# Region -> (universe file, ticker suffix, currency) for the generated universes
+SYNTHETIC_REGIONS = {
+    "USA": ("usa", "", "USD"),
+    "EU": ("europe", ".PA", "EUR"),
+    "INDIA": ("india", ".NS", "INR"),
+}
+
+# Timings this small are compared but never flagged: they are timer noise
+NOISE_FLOOR_MS = 0.01
+
+SECTORS = ["Technology", "Healthcare", "Financial Services", "Energy", "Consumer Cyclical", "Industrials"]
+
+PREFERENCES = {
+    "region": "USA",
+    "risk_appetite": "Medium",
+    "investment_horizon": "Long-term",
+    "preferred_sectors": "Technology, Healthcare",
+    "salary": "$90,000",
+    "loan": "$10,000 student loan",
+    "monthly_expense": "$3,000",
+}
+
+
+def _configure_environment(work_dir: str, provider: str) -> None:
+    """
+    Must run before the app modules are imported: they read their
+    configuration at import time.
+    """
+    os.environ.update({
+        "FINVISER_BACKGROUND_REFRESH": "0",
+        "FINVISER_SNAPSHOTS": "0",
+        "FINVISER_FX_SOURCE": "static",
+        "FINVISER_OHLC_PATH": "",
+        "FINVISER_SYMBOL_CACHE": os.path.join(work_dir, "symbol_cache.json"),
+        "FINVISER_TIMING_LOG_MS": "-1",
+        "FINVISER_RECOMMENDER": "local",
+        "PYTHONWARNINGS": "ignore",
+    })
+    if provider == "synthetic":
+        os.environ["FINVISER_UNIVERSE_DIR"] = os.path.join(work_dir, "universes")
+    sys.path.insert(0, REPO_ROOT)
+
+
+def write_universes(directory: str, companies: int) -> None:
+    os.makedirs(directory, exist_ok=True)
+    for region, (file_name, suffix, currency) in SYNTHETIC_REGIONS.items():
+        with open(os.path.join(directory, file_name + ".csv"), "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["ticker", "name", "region", "exchange", "currency", "sector"])
+            for i in range(companies):
+                writer.writerow([f"{region[:2]}{i:05d}{suffix}", f"{region.title()} Company {i} Holdings", region,
+                                 "SYN", currency, SECTORS[i % len(SECTORS)]])
+
+
+def make_synthetic_provider(latency_ms: float):
+    """
+    A MarketDataProvider whose answers depend only on the symbol, with market
+    caps spread log-uniformly from $100M to $1T so every tier is populated.
+    """
+    import numpy as np
+    import pandas as pd
+    from market_provider import MarketDataProvider
+
+    class SyntheticProvider(MarketDataProvider):
+        name = "synthetic"
+
+        def get_info(self, symbol: str) -> Dict[str, Any]:
+            self._sleep()
+            seed = zlib.crc32(symbol.encode())
+            price = 5 + seed % 995
+            currency = next((c for _, suffix, c in SYNTHETIC_REGIONS.values() if suffix and symbol.endswith(suffix)),
+                            "USD")
+            return {
+                "shortName": f"{symbol} Holdings",
+                "currency": currency,
+                "regularMarketPrice": float(price),
+                "regularMarketPreviousClose": price * (1 + ((seed >> 8) % 11 - 5) / 100),
+                "marketCap": 10 ** (8 + (seed % 4000) / 1000),
+                "volume": seed % 10_000_000,
+                "fiftyTwoWeekLow": price * 0.7,
+                "fiftyTwoWeekHigh": price * 1.3,
+                "sector": SECTORS[seed % len(SECTORS)],
+                "beta": 0.5 + (seed % 150) / 100,
+            }
+
+        def get_history(self, symbol: str, period: str = "1mo", interval: str = "1d") -> pd.DataFrame:
+            days = {"1d": 1, "5d": 5, "1mo": 31, "3mo": 92, "1y": 366, "5y": 5 * 366}.get(period)
+            start = None if days is None else datetime.now(timezone.utc) - timedelta(days=days)
+            return self.get_history_since(symbol, start, interval)
+
+        def get_history_since(self, symbol: str, start: Optional[datetime], interval: str = "1d") -> pd.DataFrame:
+            self._sleep()
+            frequency = {"5m": "5min", "1h": "h"}.get(interval, "B")
+            end = pd.Timestamp.now(tz="America/New_York").floor("5min")
+            begin = pd.Timestamp(start).tz_convert("America/New_York") if start else end - pd.Timedelta(days=3650)
+            index = pd.date_range(begin.ceil(frequency if frequency != "B" else "D"), end, freq=frequency)
+            rng = np.random.default_rng(zlib.crc32(symbol.encode()))
+            close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(index))))
+            return pd.DataFrame({"Open": close, "High": close * 1.01, "Low": close * 0.99, "Close": close,
+                                 "Volume": rng.integers(1_000, 1_000_000, len(index)).astype(float)}, index=index)
+
+        def _sleep(self) -> None:
+            if latency_ms > 0:
+                time.sleep(latency_ms / 1000.0)
+
+    return SyntheticProvider()
+
+
+class StubModel:
+    """Stands in for the Gemini model: answers instantly and remembers the prompt size."""
+
+    def __init__(self):
+        self.prompt_chars = 0
+
+    def generate_content(self, prompt: str, stream: bool = False):
+        self.prompt_chars = len(prompt)
+        response = type("StubResponse", (), {"text": "### Recommendations\n- AAPL"})()
+        return [response] if stream else response
+
+
+def summarize(seconds: List[float]) -> Dict[str, Any]:
+    ordered = sorted(seconds)
+    return {
+        "median_ms": round(statistics.median(ordered) * 1000, 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 3),
+        "min_ms": round(ordered[0] * 1000, 3),
+        "runs": len(ordered),
+    }
+
+
+def timings(fn: Callable[[], Any], runs: int, before: Optional[Callable[[], None]] = None) -> List[float]:
+    seconds = []
+    for _ in range(runs):
+        if before is not None:
+            before()
+        started = time.perf_counter()
+        fn()
+        seconds.append(time.perf_counter() - started)
+    return seconds
+
+
+def bench_company_database(args) -> List[Dict[str, Any]]:
+    import region_engine
+    from data_cache import company_db_cache
+
+    results = []
+    for key in region_engine.REGIONS:
+        cold = timings(lambda: region_engine.get_company_database(key), args.repeat,
+                       before=lambda: company_db_cache.invalidate(key))
+        warm = timings(lambda: region_engine.get_company_database(key), args.repeat * 200)
+        database = region_engine.get_company_database(key)
+        results.append({
+            "name": f"company_database.{key}",
+            "companies": sum(len(records) for records in database.values()),
+            "cold": summarize(cold),
+            "warm": summarize(warm),
+        })
+    return results
+
+
+def _run_clients(client_factory, paths: List[str], clients: int, requests_per_client: int) -> Dict[str, Any]:
+    """
+    Sends requests_per_client requests from each of `clients` threads at once;
+    returns throughput and latency.
+    """
+    latencies: List[float] = []
+    failures = []
+    lock = threading.Lock()
+    start = threading.Barrier(clients + 1)
+
+    def client(offset: int) -> None:
+        http = client_factory()
+        own = []
+        start.wait()
+        for i in range(requests_per_client):
+            path = paths[(offset + i) % len(paths)]
+            started = time.perf_counter()
+            response = http.get(path)
+            own.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                failures.append(path)
+        with lock:
+            latencies.extend(own)
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(clients)]
+    for thread in threads:
+        thread.start()
+    start.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+    return {
+        "requests": len(latencies),
+        "failures": len(failures),
+        "requests_per_second": round(len(latencies) / wall, 1),
+        "latency": summarize(latencies),
+    }
+
+
+def bench_api_stock(args) -> List[Dict[str, Any]]:
+    import app as flask_module
+    from ohlc_store import ohlc_store
+    from quote_cache import quote_cache
+    import region_engine
+
+    tickers = [ticker for region in region_engine.REGIONS.values()
+               for ticker in list(region.universe.company_map().values())[:args.tickers]]
+    paths = [f"/api/stock/{ticker}?period=1Y" for ticker in tickers]
+
+    quote_cache.invalidate()
+    ohlc_store.invalidate()
+    cold = _run_clients(flask_module.app.test_client, paths, args.clients, max(1, len(paths) // args.clients))
+    warm = _run_clients(flask_module.app.test_client, paths, args.clients, args.requests)
+    return [
+        {"name": "api_stock.cold", "clients": args.clients, "tickers": len(tickers), **cold},
+        {"name": "api_stock.warm", "clients": args.clients, "tickers": len(tickers), **warm},
+    ]
+
+
+def bench_dashboard(args) -> List[Dict[str, Any]]:
+    import app as flask_module
+    import region_engine
+
+    results = []
+    client = flask_module.app.test_client()
+    for key, region in region_engine.REGIONS.items():
+        database = region_engine.get_company_database(key)
+        with client.session_transaction() as session:
+            # The value the region dropdown stores, e.g. "NA" for USA
+            session["selected_region"] = region.aliases[0] if region.aliases else key
+        response = client.get("/dashboard")
+        if response.status_code != 200:
+            raise RuntimeError(f"/dashboard answered {response.status_code} for {key}")
+        results.append({
+            "name": f"dashboard.{key}",
+            "companies": sum(len(records) for records in database.values()),
+            "html_bytes": len(response.data),
+            "render": summarize(timings(lambda: client.get("/dashboard"), args.repeat * 10)),
+        })
+    return results
+
+
+def bench_prompt(args) -> List[Dict[str, Any]]:
+    import finviserAI
+    import region_engine
+
+    model = StubModel()
+    finviserAI._model = model
+    finviserAI.RECOMMENDER = "gemini"
+    database = region_engine.get_company_database("USA")
+    shortlist = finviserAI.PROMPT_SHORTLIST_SIZE
+
+    results = []
+    for label, size in (("shortlist", shortlist), ("full_database", 0)):
+        finviserAI.PROMPT_SHORTLIST_SIZE = size
+        prepare = timings(lambda: finviserAI._prepare_request(PREFERENCES, database), args.repeat * 5)
+        counter = iter(range(1_000_000))
+        # A different salary every run, so the recommendation cache never answers
+        generate = timings(
+            lambda: finviserAI.generate_recommendations(dict(PREFERENCES, salary=f"${next(counter)}"), database),
+            args.repeat * 5,
+        )
+        results.append({
+            "name": f"prompt.{label}",
+            "shortlist_size": size,
+            "prompt_chars": model.prompt_chars,
+            "prepare": summarize(prepare),
+            "generate_with_stub_model": summarize(generate),
+        })
+    finviserAI.PROMPT_SHORTLIST_SIZE = shortlist
+    return results
+
+
+RUNNERS = {
+    "company_database": bench_company_database,
+    "api_stock": bench_api_stock,
+    "dashboard": bench_dashboard,
+    "prompt": bench_prompt,
+}
+
+
+def _commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def flatten(result: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    """
+    {"name": "x", "cold": {"median_ms": 3}} -> {"x.cold.median_ms": 3}
+    """
+    prefix = prefix or result["name"]
+    flat = {}
+    for key, value in result.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}.{key}"))
+        elif key.endswith(("median_ms", "requests_per_second")):
+            flat[f"{prefix}.{key}"] = value
+    return flat
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], threshold: float, out=sys.stdout) -> List[str]:
+    """
+    Prints the change of every median and throughput against baseline;
+    returns the metrics that got worse by more than threshold percent.
+    """
+    before = {k: v for result in baseline["results"] for k, v in flatten(result).items()}
+    after = {k: v for result in report["results"] for k, v in flatten(result).items()}
+    regressions = []
+    print(f"\nCompared with {baseline.get('commit') or 'baseline'}:", file=out)
+    if baseline.get("config") != report["config"]:
+        print(f"  note: baseline ran with {baseline.get('config')}", file=out)
+    for metric, value in after.items():
+        old = before.get(metric)
+        if not old:
+            continue
+        change = (value - old) / old * 100
+        # Lower is better for times, higher for throughput
+        worse = change if metric.endswith("_ms") else -change
+        noise = metric.endswith("_ms") and max(old, value) < NOISE_FLOOR_MS
+        flag = "  REGRESSION" if worse > threshold and not noise else ""
+        print(f"  {metric:<60}{old:>12.3f} -> {value:<12.3f}{change:+7.1f}%{flag}", file=out)
+        if flag:
+            regressions.append(metric)
+    return regressions
+
+
+def run(args) -> Dict[str, Any]:
+    work_dir = tempfile.mkdtemp(prefix="finviser-bench-")
+    _configure_environment(work_dir, args.provider)
+    if args.provider == "synthetic":
+        write_universes(os.environ["FINVISER_UNIVERSE_DIR"], args.companies)
+
+    import jinja2
+    import market_provider
+    import app as flask_module
+
+    if args.provider == "synthetic":
+        market_provider.set_provider(make_synthetic_provider(args.latency_ms))
+    else:
+        market_provider.set_provider(market_provider.ReplayProvider(
+            args.replay_dir or market_provider.REPLAY_DIR, latency_ms=args.latency_ms))
+    if not os.path.isdir(os.path.join(flask_module.app.root_path, flask_module.app.template_folder)):
+        # The page templates sit next to app.py in this checkout
+        flask_module.app.jinja_loader = jinja2.FileSystemLoader(REPO_ROOT)
+
+    results = []
+    for name in args.benchmarks or BENCHMARKS:
+        started = time.perf_counter()
+        results.extend(RUNNERS[name](args))
+        print(f"{name} done in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+    return {
+        "benchmark": "hot_paths",
+        "commit": _commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "config": {
+            "provider": args.provider,
+            "companies_per_region": args.companies if args.provider == "synthetic" else None,
+            "latency_ms": args.latency_ms,
+            "repeat": args.repeat,
+            "clients": args.clients,
+        },
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("benchmarks", nargs="*", metavar="bench", help=f"any of {', '.join(BENCHMARKS)}")
+    parser.add_argument("--provider", choices=("synthetic", "replay"), default="synthetic")
+    parser.add_argument("--replay-dir", help="recordings for --provider replay (default: fixtures/market_data)")
+    parser.add_argument("--companies", type=int, default=2000, help="companies per generated region universe")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="sleep added to every provider call")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--clients", type=int, default=8, help="concurrent /api/stock clients")
+    parser.add_argument("--requests", type=int, default=50, help="warm /api/stock requests per client")
+    parser.add_argument("--tickers", type=int, default=20, help="tickers per region requested from /api/stock")
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    parser.add_argument("--compare", help="JSON report of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="percent change counted as a regression")
+    args = parser.parse_args()
+    unknown = [name for name in args.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark {', '.join(unknown)}; choose from {', '.join(BENCHMARKS)}")
+
+    # The app reports on stdout; keep it on stderr so --json output stays parseable
+    with contextlib.redirect_stdout(sys.stderr):
+        report = run(args)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for result in report["results"]:
+            metrics = ", ".join(f"{k[len(result['name']) + 1:]} {v}" for k, v in flatten(result).items())
+            print(f"{result['name']:<28}{metrics}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        # Beside --json output the comparison goes to stderr
+        regressions = compare(report, baseline, args.threshold, sys.stderr if args.json else sys.stdout)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
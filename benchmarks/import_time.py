@@ -0,0 +1,120 @@
+"""
+Startup benchmark: the cold import cost of each FinviserAI module.
+
+    python benchmarks/import_time.py [--json] [--repeat N] [--top N] [--preload] [module ...]
+
+Every module is imported in a fresh interpreter, so each number is what a new
+worker (or a cold serverless start) pays for it. The wall time is the median
+of --repeat runs; the heaviest direct dependencies come from
+`python -X importtime` on the last run. The configuration is the default
+one (background refresh and snapshots on): app starts that work on its first
+request, so it is not part of the import.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Any, Dict, List, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = [
+    "app",
+    "asgi",
+    "finviserAI",
+    "region_engine",
+    "recommendation_engine",
+    "database_usa",
+    "quote_cache",
+    "fx_rates",
+]
+
+MARKER = "__import_seconds__"
+
+
+def _environment(preload: bool) -> Dict[str, str]:
+    env = dict(os.environ)
+    # Measure the shipped defaults, whatever the calling shell overrides
+    for name in ("FINVISER_BACKGROUND_REFRESH", "FINVISER_SNAPSHOTS"):
+        env.pop(name, None)
+    env.update({
+        "FINVISER_PRELOAD_MODULES": "1" if preload else "0",
+        "PYTHONDONTWRITEBYTECODE": "1",
+        "PYTHONWARNINGS": "ignore",
+    })
+    return env
+
+
+def _run(module: str, env: Dict[str, str]) -> Tuple[float, str]:
+    code = f"import time; t = time.perf_counter(); import {module}; print({MARKER!r}, time.perf_counter() - t)"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    seconds = next(float(line.split()[-1]) for line in reversed(result.stdout.splitlines()) if line.startswith(MARKER))
+    return seconds, result.stderr
+
+
+def parse_importtime(stderr: str, module: str) -> List[Dict[str, Any]]:
+    """
+    Returns the direct dependencies of `module` with their cumulative import
+    time, heaviest first. importtime lists children before their parent, one
+    indent level deeper.
+    """
+    children: List[Dict[str, Any]] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative_us, name = line.split("|")
+        # One space after the bar, then two per nesting level
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        name = name.strip()
+        if depth == 0:
+            if name == module:
+                return sorted(children, key=lambda c: c["cumulative_ms"], reverse=True)
+            children = []
+        elif depth == 1:
+            children.append({"module": name, "cumulative_ms": round(int(cumulative_us) / 1000, 1)})
+    return []
+
+
+def measure(module: str, repeat: int, top: int, preload: bool) -> Dict[str, Any]:
+    env = _environment(preload)
+    timings, stderr = [], ""
+    for _ in range(repeat):
+        seconds, stderr = _run(module, env)
+        timings.append(seconds)
+    return {
+        "module": module,
+        "median_ms": round(statistics.median(timings) * 1000, 1),
+        "min_ms": round(min(timings) * 1000, 1),
+        "runs": repeat,
+        "heaviest_dependencies": parse_importtime(stderr, module)[:top],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=5, help="dependencies listed per module")
+    parser.add_argument("--preload", action="store_true", help="measure with FINVISER_PRELOAD_MODULES=1")
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    args = parser.parse_args()
+
+    results = [measure(m, args.repeat, args.top, args.preload) for m in args.modules]
+
+    if args.json:
+        print(json.dumps({"benchmark": "import_time", "preload": args.preload, "results": results}, indent=2))
+        return
+
+    print(f"{'module':<24}{'median ms':>12}{'min ms':>10}   heaviest direct dependencies")
+    for result in results:
+        deps = ", ".join(f"{d['module']} {d['cumulative_ms']:.0f}ms" for d in result["heaviest_dependencies"])
+        print(f"{result['module']:<24}{result['median_ms']:>12.1f}{result['min_ms']:>10.1f}   {deps}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import base64
+from typing import Any, Tuple
+
+import numpy as np
+
+
+# Downsampling methods accepted by downsample()
+METHODS = ("lttb", "minmax")
+
+# Wire formats accepted by encode()
+ENCODINGS = ("json", "binary")
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: picks `threshold` points that keep the
+    visual shape of the line. The first and last points are always kept; from
+    every bucket in between the point forming the largest triangle with the
+    previous pick and the next bucket's average is chosen.
+    """
+    n = len(y)
+    if threshold >= n:
+        return np.arange(n)
+    if threshold < 3:
+        return np.linspace(0, n - 1, threshold).astype(int)
+
+    # threshold - 2 buckets over the interior points; every bucket is non-empty
+    # because threshold < n
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    picks = np.empty(threshold, dtype=int)
+    picks[0], picks[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start = end
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        picks[i + 1] = a
+    return picks
+
+
+def minmax_indices(y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Keeps the lowest and highest point of (threshold - 2) // 2 equal buckets
+    plus the first and last points, so no spike is ever dropped.
+    """
+    n = len(y)
+    if threshold >= n:
+        return np.arange(n)
+    if threshold < 4:
+        return np.linspace(0, n - 1, threshold).astype(int)
+
+    edges = np.linspace(0, n, (threshold - 2) // 2 + 1).astype(int)
+    picks = [0, n - 1]
+    for start, end in zip(edges[:-1], edges[1:]):
+        bucket = y[start:end]
+        picks.append(start + int(np.argmin(bucket)))
+        picks.append(start + int(np.argmax(bucket)))
+    return np.unique(picks)
+
+
+def downsample(x, y, threshold: int, method: str = "lttb") -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reduces the parallel series x (e.g. epoch times) and y (prices) to at most
+    `threshold` points; a threshold of 0 or more points than the series has
+    returns it unchanged.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown downsampling method: {method}")
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=float)
+    if threshold <= 0 or threshold >= len(y):
+        return x, y
+    if method == "minmax":
+        picks = minmax_indices(y, threshold)
+    else:
+        picks = lttb_indices(x.astype(float), y, threshold)
+    return x[picks], y[picks]
+
+
+def encode(timestamps, values, encoding: str = "json") -> Tuple[Any, Any]:
+    """
+    Serializes parallel epoch-millisecond timestamps and values. "json" gives
+    plain lists; "binary" gives base64 strings of little-endian int64
+    timestamps and float32 values, about half the size of the lists.
+    """
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Unknown encoding: {encoding}")
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    values = np.asarray(values, dtype=float)
+    if encoding == "binary":
+        return (base64.b64encode(timestamps.astype("<i8").tobytes()).decode("ascii"),
+                base64.b64encode(values.astype("<f4").tobytes()).decode("ascii"))
+    return timestamps.tolist(), values.tolist()
@@ -0,0 +1,53 @@
+from typing import Any, Dict, List, Optional
+
+
+class CompanyRecord:
+    """
+    One classified company, with every figure kept as a number: market_cap
+    in the listing currency, market_cap_usd in US dollars, price and the
+    52-week range in the listing currency, change_percent against the previous
+    close. Missing figures are None. Display strings are produced only where the
+    data leaves the process (templates, JSON, the CLI table).
+    """
+
+    __slots__ = ('name', 'ticker', 'currency', 'market_cap', 'market_cap_usd', 'tier', 'sector', 'beta',
+                 'price', 'change_percent', 'low_52w', 'high_52w')
+
+    def __init__(self, name: str, ticker: str, currency: Optional[str], market_cap: Optional[float],
+                 market_cap_usd: Optional[float], tier: str, sector: Optional[str] = None,
+                 beta: Optional[float] = None, price: Optional[float] = None,
+                 change_percent: Optional[float] = None, low_52w: Optional[float] = None,
+                 high_52w: Optional[float] = None):
+        self.name = name
+        self.ticker = ticker
+        self.currency = currency
+        self.market_cap = market_cap
+        self.market_cap_usd = market_cap_usd
+        self.tier = tier
+        self.sector = sector
+        self.beta = beta
+        self.price = price
+        self.change_percent = change_percent
+        self.low_52w = low_52w
+        self.high_52w = high_52w
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CompanyRecord":
+        return cls(**{field: data.get(field) for field in cls.__slots__})
+
+    def __repr__(self) -> str:
+        return f"CompanyRecord({self.ticker!r}, {self.tier!r}, market_cap_usd={self.market_cap_usd!r})"
+
+
+def database_as_dicts(database: Dict[str, List[CompanyRecord]]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    The JSON-ready form of a {tier: [CompanyRecord, ...]} database.
+    """
+    return {tier: [record.as_dict() for record in records] for tier, records in database.items()}
+
+
+def database_from_dicts(data: Dict[str, List[Dict[str, Any]]]) -> Dict[str, List[CompanyRecord]]:
+    return {tier: [CompanyRecord.from_dict(row) for row in rows] for tier, rows in data.items()}
@@ -0,0 +1,185 @@
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+# --- Configuration for the Company Database Cache ---
+
+# Seconds a regional company database is considered fresh
+COMPANY_DB_TTL = float(os.getenv("FINVISER_COMPANY_DB_TTL", "300"))
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls for the same key into one execution.
+
+    The first caller runs the loader; everyone arriving while it is in flight
+    waits for, and receives, the same result (or exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Hashable, Future] = {}
+        # Calls that were answered by joining someone else's in-flight load
+        self.shared = 0
+
+    def do(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        future, leader = self._join(key)
+        if leader:
+            self._run(key, future, loader)
+        return future.result()
+
+    def do_async(self, key: Hashable, loader: Callable[[], Any]) -> Future:
+        """
+        Starts the loader on a daemon thread unless one is already running for key.
+        """
+        future, leader = self._join(key)
+        if leader:
+            threading.Thread(
+                target=self._run, args=(key, future, loader, True),
+                name=f"finviser-refresh-{key}", daemon=True,
+            ).start()
+        return future
+
+    def in_flight(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._in_flight
+
+    def _join(self, key: Hashable) -> Tuple[Future, bool]:
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.shared += 1
+                return future, False
+            future = Future()
+            self._in_flight[key] = future
+            return future, True
+
+    def _run(self, key: Hashable, future: Future, loader: Callable[[], Any], background: bool = False) -> None:
+        try:
+            future.set_result(loader())
+        except Exception as e:
+            if background:
+                print(f"Error refreshing {key} in the background: {e}")
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+
+class StaleWhileRevalidateCache:
+    """
+    Process-wide TTL cache that keeps serving the last value after it expires
+    while a single background refresh replaces it.
+
+    Only a cold key blocks the caller, and concurrent cold callers share one load.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: Dict[Hashable, Tuple[Any, float]] = {}
+        self._flight = SingleFlight()
+        # Called with (key, value) whenever a freshly loaded value is stored
+        self.on_update: Optional[Callable[[Hashable, Any], None]] = None
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        # Loads that raised; the previous value, if any, stays cached
+        self.load_errors = 0
+        self.last_error: Optional[str] = None
+
+    def get(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+
+        if entry is None:
+            with self._lock:
+                self.misses += 1
+            return self._flight.do(key, lambda: self._load(key, loader))
+
+        value, fetched_at = entry
+        if time.monotonic() - fetched_at < self.ttl:
+            with self._lock:
+                self.hits += 1
+            return value
+
+        with self._lock:
+            self.stale_hits += 1
+        self._flight.do_async(key, lambda: self._load(key, loader))
+        return value
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """
+        Returns the cached value for key without loading or refreshing it.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+        return entry[0] if entry else None
+
+    def warm(self, key: Hashable, loader: Callable[[], Any]) -> None:
+        """
+        Starts loading key in the background unless it is already cached.
+        """
+        with self._lock:
+            if key in self._entries:
+                return
+        self._flight.do_async(key, lambda: self._load(key, loader))
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+        if self.on_update is not None:
+            try:
+                self.on_update(key, value)
+            except Exception as e:
+                print(f"Error in cache update hook for {key}: {e}")
+
+    def prime(self, key: Hashable, value: Any, age: float) -> None:
+        """
+        Seeds key with a value fetched `age` seconds ago (e.g. from a snapshot),
+        unless a newer one is already cached. Old values are served as stale.
+        """
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = (value, time.monotonic() - age)
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "load_errors": self.load_errors,
+                "last_error": self.last_error,
+            }
+
+    def _load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Stores what loader returns. A loader that raises stores nothing, so an
+        expired value keeps being served until a load succeeds; loaders raise
+        to reject a result that must not replace the cached one.
+        """
+        try:
+            value = loader()
+        except Exception as e:
+            with self._lock:
+                self.load_errors += 1
+                self.last_error = f"{key}: {e}"
+            raise
+        self.put(key, value)
+        return value
+
+
+# Shared by every regional get_company_database()
+company_db_cache = StaleWhileRevalidateCache(ttl=COMPANY_DB_TTL)
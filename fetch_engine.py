@@ -0,0 +1,76 @@
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Deque, Dict, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+# --- Configuration for Concurrent Fetching ---
+
+# Maximum number of upstream requests in flight at once
+DEFAULT_MAX_WORKERS = int(os.getenv("FINVISER_FETCH_WORKERS", "8"))
+
+# Seconds one item may run before it is reported as timed out; its slot then
+# goes to the next item, so a hung symbol never delays the ones after it
+DEFAULT_TIMEOUT = float(os.getenv("FINVISER_FETCH_TIMEOUT", "10"))
+
+
+def fetch_concurrently(
+    items: List[T],
+    fetch_one: Callable[[T], R],
+    on_error: Callable[[T, Exception], R],
+    max_workers: Optional[int] = None,
+    timeout: Optional[float] = None,
+) -> List[R]:
+    """
+    Runs fetch_one over every item with at most `max_workers` in flight and
+    returns the results in input order.
+
+    Items that raise, or that run longer than `timeout` seconds, are replaced
+    by on_error(item, exc). The timeout is per item, counted from when it
+    starts: a timed-out call is abandoned (its thread finishes in the
+    background) and the next item starts in its place.
+    """
+    if not items:
+        return []
+
+    workers = max(1, min(max_workers or DEFAULT_MAX_WORKERS, len(items)))
+    per_item_timeout = timeout if timeout is not None else DEFAULT_TIMEOUT
+
+    results: List[Optional[R]] = [None] * len(items)
+    pending: Deque[int] = deque(range(len(items)))
+    # future -> (item position, deadline)
+    running: Dict[Future, Tuple[int, float]] = {}
+
+    # Sized for every item so abandoned threads never starve new ones; idle
+    # threads are reused, so normally only `workers` threads ever exist
+    executor = ThreadPoolExecutor(max_workers=len(items), thread_name_prefix="finviser-fetch")
+    try:
+        while pending or running:
+            while pending and len(running) < workers:
+                i = pending.popleft()
+                running[executor.submit(fetch_one, items[i])] = (i, time.monotonic() + per_item_timeout)
+
+            next_deadline = min(deadline for _, deadline in running.values())
+            done, _ = wait(running, timeout=max(0.0, next_deadline - time.monotonic()),
+                           return_when=FIRST_COMPLETED)
+            for future in done:
+                i, _ = running.pop(future)
+                try:
+                    results[i] = future.result()
+                except Exception as e:
+                    results[i] = on_error(items[i], e)
+
+            now = time.monotonic()
+            for future, (i, deadline) in list(running.items()):
+                if deadline <= now and not future.done():
+                    del running[future]
+                    future.cancel()
+                    results[i] = on_error(items[i], TimeoutError(f"timed out after {per_item_timeout}s"))
+        return results
+    finally:
+        # Never hold the caller hostage to a hung upstream request
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -1,21 +1,156 @@
 import os
-import google.generativeai as genai
+import asyncio
 import json
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
 from dotenv import load_dotenv
-from database_usa import get_company_database as get_usa_db
-from database_europe import get_company_database as get_eu_db
-from database_india import get_company_database as get_india_db
+from formatting import USD_PER_BILLION
+from lazy_imports import lazy_module
+from metrics import upstream_call
+
+# Loaded on first use: they pull in pandas and NumPy
+region_engine = lazy_module("region_engine")
+recommendation_engine = lazy_module("recommendation_engine")
 
 load_dotenv()
 
 API_KEY = os.getenv("GEMINI_API_KEY")
 
 if not API_KEY:
-    print("Error: GEMINI_API_KEY environment variable not set.")
-    print("Please set it in your environment or create a .env file with the key.")
-    exit()
+    print("Warning: GEMINI_API_KEY environment variable not set.")
+    print("Recommendations will come from the local scoring engine only.")
+
+# "gemini" asks the model (falling back to the local engine when it fails),
+# "local" always answers from the in-process scoring engine
+RECOMMENDER = os.getenv("FINVISER_RECOMMENDER", "gemini" if API_KEY else "local")
+
+# Companies per tier sent to Gemini after local pre-filtering; 0 sends the whole database
+PROMPT_SHORTLIST_SIZE = int(os.getenv("FINVISER_PROMPT_SHORTLIST", "10"))
+
+MODEL_NAME = 'gemini-pro-latest'
+
+# Seconds the async path waits for Gemini before answering locally instead
+GEMINI_TIMEOUT = float(os.getenv("FINVISER_GEMINI_TIMEOUT", "60"))
+
+# Seconds an answer is reused for the same region, data snapshot and preferences
+RECOMMENDATION_TTL = float(os.getenv("FINVISER_RECOMMENDATION_TTL", "900"))
+
+# Maximum number of cached answers before the least recently used is dropped
+RECOMMENDATION_CACHE_SIZE = int(os.getenv("FINVISER_RECOMMENDATION_CACHE_SIZE", "256"))
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def get_model():
+    """
+    Returns the shared Gemini model client, creating it on first use. The
+    Gemini SDK is only imported and configured here, since importing it costs
+    about a second of startup.
+    """
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                import google.generativeai as genai
+                genai.configure(api_key=API_KEY)
+                _model = genai.GenerativeModel(MODEL_NAME)
+    return _model
+
+
+class RecommendationCache:
+    """LRU cache of generated answers with a TTL."""
+
+    def __init__(self, max_size=RECOMMENDATION_CACHE_SIZE, ttl=RECOMMENDATION_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[1] >= self.ttl:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+recommendation_cache = RecommendationCache()
+
+
+def encode_database(database):
+    """
+    Minified, tabular encoding of a {tier: [CompanyRecord, ...]} database for
+    the prompt: one "Tier|Name|Ticker|MarketCap" line per company, with the
+    market cap as a plain number of USD billions.
+    """
+    lines = ["Tier|Name|Ticker|MarketCap(USD bn)"]
+    for tier, companies in database.items():
+        for company in companies:
+            cap = "" if company.market_cap_usd is None else f"{company.market_cap_usd / USD_PER_BILLION:.2f}"
+            lines.append(f"{tier}|{company.name}|{company.ticker}|{cap}")
+    return "\n".join(lines)
+
+
+def _normalize_text(value):
+    return " ".join(str(value or "").lower().split())
+
+
+def _normalize_amount(value):
+    """Reduces "$50,000", "50000 USD" and "50k" style answers to one form."""
+    text = _normalize_text(value)
+    amount = recommendation_engine.parse_amount(text)
+    if amount is None:
+        return text
+    # Words such as "per month" change the meaning; currency words do not
+    words = [w for w in re.findall(r"[a-z]{2,}", text) if w not in ("usd", "dollars")]
+    return " ".join([f"{amount:.0f}"] + words)
+
+
+def normalize_preferences(preferences):
+    """
+    Canonical form of the preferences, so submissions that only differ in
+    case, spacing, sector order or money formatting share a cache entry.
+    """
+    return {
+        "risk_appetite": _normalize_text(preferences.get('risk_appetite')),
+        "investment_horizon": _normalize_text(preferences.get('investment_horizon')),
+        "preferred_sectors": recommendation_engine.parse_sectors(preferences.get('preferred_sectors')),
+        "salary": _normalize_amount(preferences.get('salary')),
+        "loan": _normalize_amount(preferences.get('loan')),
+        "monthly_expense": _normalize_amount(preferences.get('monthly_expense')),
+    }
+
 
-genai.configure(api_key=API_KEY)
+def recommendation_key(preferences, encoded_database):
+    """Cache key over (recommender, region, database snapshot version, normalized preferences)."""
+    payload = {
+        "recommender": RECOMMENDER,
+        "region": _normalize_text(preferences.get('region')),
+        "database_version": hashlib.sha1(encoded_database.encode("utf-8")).hexdigest(),
+        "preferences": normalize_preferences(preferences),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
 
 def get_user_preferences():
     """Gathers investment preferences from the user."""
@@ -52,22 +187,118 @@ def generate_recommendations(preferences, database):
     Uses the Gemini API to generate stock recommendations based on user preferences
     and a company database.
     """
+    if RECOMMENDER == "local":
+        return recommendation_engine.generate_local_recommendations(preferences, database)
+
+    cache_key, prompt = _prepare_request(preferences, database)
+    cached = recommendation_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
     print("\nAnalyzing market data and generating recommendations... This may take a moment.")
 
+    try:
+        with upstream_call("gemini_generate"):
+            response = get_model().generate_content(prompt)
+            text = response.text
+    except Exception as e:
+        return _fallback_recommendations(preferences, database, e)
+    recommendation_cache.put(cache_key, text)
+    return text
+
+
+def generate_recommendations_stream(preferences, database):
+    """
+    Generator variant of generate_recommendations that yields the markdown
+    answer in chunks as Gemini produces them. A cached answer is yielded whole.
+    """
+    if RECOMMENDER == "local":
+        yield recommendation_engine.generate_local_recommendations(preferences, database)
+        return
+
+    cache_key, prompt = _prepare_request(preferences, database)
+    cached = recommendation_cache.get(cache_key)
+    if cached is not None:
+        yield cached
+        return
+
+    parts = []
+    try:
+        # Timed from the request to the last chunk, including the client reading earlier ones
+        with upstream_call("gemini_stream"):
+            for chunk in get_model().generate_content(prompt, stream=True):
+                text = chunk.text
+                if text:
+                    parts.append(text)
+                    yield text
+    except Exception as e:
+        if parts:
+            # Part of the answer is already on screen; only report the failure
+            yield f"\n\nAn error occurred while communicating with the Gemini API: {e}"
+        else:
+            yield _fallback_recommendations(preferences, database, e)
+        return
+    recommendation_cache.put(cache_key, "".join(parts))
+
+
+async def generate_recommendations_async(preferences, database):
+    """
+    Coroutine variant of generate_recommendations for the ASGI entry point; it
+    awaits Gemini's async client instead of holding a thread.
+    """
+    if RECOMMENDER == "local":
+        return recommendation_engine.generate_local_recommendations(preferences, database)
+
+    cache_key, prompt = _prepare_request(preferences, database)
+    cached = recommendation_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    try:
+        with upstream_call("gemini_generate"):
+            # The async client can wait forever on a dead connection
+            response = await asyncio.wait_for(get_model().generate_content_async(prompt), GEMINI_TIMEOUT)
+            text = response.text
+    except Exception as e:
+        return _fallback_recommendations(preferences, database, e)
+    recommendation_cache.put(cache_key, text)
+    return text
+
+
+def _fallback_recommendations(preferences, database, error):
+    """Answers from the local scoring engine when Gemini is unavailable."""
+    print(f"Error communicating with the Gemini API, using local recommendations: {error}")
+    return recommendation_engine.generate_local_recommendations(preferences, database)
+
+
+def _prepare_request(preferences, database):
+    """
+    Returns (cache key, prompt) for a recommendation request. Only the local
+    engine's best candidates per tier are sent, which keeps the prompt small
+    as the universe grows.
+    """
+    if PROMPT_SHORTLIST_SIZE > 0:
+        database = recommendation_engine.shortlist(database, preferences, PROMPT_SHORTLIST_SIZE)
+    encoded_database = encode_database(database)
+    return recommendation_key(preferences, encoded_database), build_prompt(preferences, encoded_database)
+
+
+def build_prompt(preferences, encoded_database):
+    """Builds the Gemini prompt from the preferences and the encoded database."""
     prompt = f"""
     You are a sophisticated personal finance agent. Your task is to recommend stocks
     based on the user's preferences and your analysis of real-time financial data.
 
-    **Company Database:**
-    {json.dumps(database, indent=2)}
+    **Company Database (pipe-separated):**
+    {encoded_database}
 
     **User Preferences:**
-    - Risk Appetite: {preferences['risk_appetite']}
-    - Investment Horizon: {preferences['investment_horizon']}
-    - Preferred Sectors: {preferences['preferred_sectors'] or 'Any'}
-    - Annual Salary: {preferences['salary'] or 'Not specified'}
-    - Outstanding Loans: {preferences['loan'] or 'None'}
-    - Monthly Expenses: {preferences['monthly_expense'] or 'Not specified'}
+    - Risk Appetite: {preferences.get('risk_appetite') or 'Not specified'}
+    - Investment Horizon: {preferences.get('investment_horizon') or 'Not specified'}
+    - Preferred Sectors: {preferences.get('preferred_sectors') or 'Any'}
+    - Annual Salary: {preferences.get('salary') or 'Not specified'}
+    - Outstanding Loans: {preferences.get('loan') or 'None'}
+    - Monthly Expenses: {preferences.get('monthly_expense') or 'Not specified'}
 
     **Instructions:**
     1.  Analyze the provided company database.
@@ -106,28 +337,16 @@ def generate_recommendations(preferences, database):
     **Disclaimer**: This is not financial advice. Please consult with a professional financial advisor
     before making any investment decisions.
     """
-
-    try:
-        model = genai.GenerativeModel('gemini-pro-latest')
-        response = model.generate_content(prompt)
-        return response.text
-    except Exception as e:
-        return f"An error occurred while communicating with the Gemini API: {e}"
+    # The source indentation is pure token overhead for the model
+    return "\n".join(line.strip() for line in prompt.strip().splitlines())
 
 def main():
     """Main function to run the personal finance agent."""
     user_preferences = get_user_preferences()
     
     print(f"\nFetching real-time market data for {user_preferences['region']}...")
-    region = user_preferences['region']
-    if region == "USA":
-        company_database = get_usa_db()
-    elif region == "EU":
-        company_database = get_eu_db()
-    elif region == "INDIA":
-        company_database = get_india_db()
-    
-    
+    company_database = region_engine.get_company_database(user_preferences['region'])
+
     recommendations = generate_recommendations(user_preferences, company_database)
     print("\n" + "="*50)
     print(recommendations)
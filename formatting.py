@@ -0,0 +1,30 @@
+import math
+from typing import Optional
+
+USD_PER_BILLION = 1_000_000_000
+USD_PER_MILLION = 1_000_000
+
+
+def _missing(value: Optional[float]) -> bool:
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def format_usd(value: Optional[float], unit: float = 1, missing: str = 'N/A') -> str:
+    """
+    "$1,234.56" with value expressed in `unit` dollars, e.g. unit=USD_PER_BILLION.
+    """
+    if _missing(value):
+        return missing
+    return f"${value / unit:,.2f}"
+
+
+def format_compact_usd(value: Optional[float], missing: str = 'N/A') -> str:
+    """
+    "$2.9B" for a billion or more, "$850.0M" below.
+    """
+    if _missing(value):
+        return missing
+    if value >= USD_PER_BILLION:
+        return f"${value / USD_PER_BILLION:,.1f}B"
+    return f"${value / USD_PER_MILLION:,.1f}M"
+
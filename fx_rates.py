@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, Optional, Sequence, Union
+
+from data_cache import SingleFlight
+from metrics import upstream_call
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+# --- Configuration for Currency Conversion ---
+
+# Where rates come from: "http", "static" or "file:<path to JSON>"
+FX_SOURCE = os.getenv("FINVISER_FX_SOURCE", "http")
+
+# Seconds between background refreshes of the rate table
+FX_REFRESH_SECONDS = float(os.getenv("FINVISER_FX_REFRESH_SECONDS", "3600"))
+
+FX_API_URL = os.getenv("FINVISER_FX_API_URL", "https://api.exchangerate.host/latest?base=USD")
+
+# Approximate USD value of one unit of each currency. Served until the first
+# refresh lands and whenever the configured source is unavailable.
+DEFAULT_USD_RATES = {
+    'USD': 1.00,
+    'EUR': 1.07,
+    'CHF': 1.10,
+    'INR': 1 / 83.0,
+}
+
+
+def usd_rates_from_quotes(base: str, rates: Dict[str, float]) -> Dict[str, float]:
+    """
+    Turns exchangerate-style quotes ("1 base = rates[c] units of c") into the
+    USD value of one unit of each currency.
+    """
+    rates = {c.upper(): float(r) for c, r in rates.items() if r}
+    rates[base.upper()] = 1.0
+    if 'USD' not in rates:
+        raise ValueError(f"Rate table based on {base} has no USD quote")
+    usd_per_base = rates['USD']
+    return {currency: usd_per_base / rate for currency, rate in rates.items()}
+
+
+class StaticFxSource:
+    """Fixed rates, for offline runs and tests."""
+
+    def __init__(self, usd_rates: Optional[Dict[str, float]] = None):
+        self.usd_rates = dict(usd_rates or DEFAULT_USD_RATES)
+
+    def fetch(self) -> Dict[str, float]:
+        return dict(self.usd_rates)
+
+
+class FileFxSource:
+    """Reads {"base": ..., "rates": {...}} quotes from a local JSON file."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def fetch(self) -> Dict[str, float]:
+        with open(self.path, encoding="utf-8") as f:
+            payload = json.load(f)
+        return usd_rates_from_quotes(payload.get('base', 'USD'), payload['rates'])
+
+
+class HttpFxSource:
+    """Fetches live quotes from an exchangerate.host compatible API."""
+
+    def __init__(self, url: str = FX_API_URL, timeout: float = 5):
+        self.url = url
+        self.timeout = timeout
+
+    def fetch(self) -> Dict[str, float]:
+        import requests
+        with upstream_call("fx_rates"):
+            payload = requests.get(self.url, timeout=self.timeout).json()
+        return usd_rates_from_quotes(payload.get('base', 'USD'), payload['rates'])
+
+    async def fetch_async(self) -> Dict[str, float]:
+        from async_support import get_http_client
+        with upstream_call("fx_rates"):
+            response = await get_http_client().get(self.url, timeout=self.timeout)
+            payload = response.json()
+        return usd_rates_from_quotes(payload.get('base', 'USD'), payload['rates'])
+
+
+class FxRateService:
+    """
+    Cached table of USD conversion rates.
+
+    Readers never block on the source: once the table is older than
+    refresh_seconds, the next read starts a single background refresh and keeps
+    answering from the current table until it lands.
+    """
+
+    def __init__(self, source, refresh_seconds: float = FX_REFRESH_SECONDS):
+        self.source = source
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._usd_rates: Dict[str, float] = dict(DEFAULT_USD_RATES)
+        # Never refreshed yet, so the first read kicks off a background load
+        self._refreshed_at = float("-inf")
+        self._flight = SingleFlight()
+
+    def rate(self, currency: str, default: float = 1.0) -> float:
+        """
+        Returns the USD value of one unit of currency.
+        """
+        self._maybe_refresh()
+        with self._lock:
+            return self._usd_rates.get((currency or 'USD').upper(), default)
+
+    def convert(self, amounts: Union[float, Sequence[float], np.ndarray],
+                currencies: Union[str, Sequence[str], np.ndarray], to: str = 'USD') -> Union[float, np.ndarray]:
+        """
+        Converts amounts quoted in currencies into `to`. Accepts a scalar or
+        array of amounts and either one currency or one currency per amount.
+        """
+        import numpy as np
+        self._maybe_refresh()
+        with self._lock:
+            table = dict(self._usd_rates)
+        target = table.get(to.upper(), 1.0)
+
+        values = np.asarray(amounts, dtype=float)
+        if isinstance(currencies, str):
+            factors = table.get(currencies.upper(), 1.0) / target
+        else:
+            codes, inverse = np.unique(np.asarray(currencies, dtype=str), return_inverse=True)
+            lookup = np.array([table.get(c.upper(), 1.0) for c in codes], dtype=float) / target
+            factors = lookup[inverse].reshape(values.shape)
+
+        converted = values * factors
+        return float(converted) if converted.ndim == 0 else converted
+
+    def rates(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._usd_rates)
+
+    def refresh(self) -> Dict[str, float]:
+        """
+        Loads the latest rates from the source, keeping the current table if it fails.
+        """
+        try:
+            fetched = self.source.fetch()
+        except Exception as e:
+            return self._refresh_failed(e)
+        return self._apply(fetched)
+
+    async def refresh_async(self) -> Dict[str, float]:
+        """
+        Like refresh(), but uses the shared async HTTP client when the source
+        supports it, so the event loop never blocks on the FX API.
+        """
+        fetch_async = getattr(self.source, "fetch_async", None)
+        if fetch_async is None:
+            return self.refresh()  # local sources never block for long
+        try:
+            fetched = await fetch_async()
+        except Exception as e:
+            return self._refresh_failed(e)
+        return self._apply(fetched)
+
+    def _apply(self, fetched: Dict[str, float]) -> Dict[str, float]:
+        with self._lock:
+            self._usd_rates.update(fetched)
+            self._refreshed_at = time.monotonic()
+            return dict(self._usd_rates)
+
+    def _refresh_failed(self, e: Exception) -> Dict[str, float]:
+        print(f"Error refreshing FX rates: {e}")
+        with self._lock:
+            # Retry on the normal cadence instead of on every read
+            self._refreshed_at = time.monotonic()
+            return dict(self._usd_rates)
+
+    def _maybe_refresh(self) -> None:
+        with self._lock:
+            stale = time.monotonic() - self._refreshed_at >= self.refresh_seconds
+        if stale:
+            self._flight.do_async("fx", self.refresh)
+
+
+def _build_source(spec: str):
+    if spec == "static":
+        return StaticFxSource()
+    if spec.startswith("file:"):
+        return FileFxSource(spec[len("file:"):])
+    return HttpFxSource()
+
+
+fx_service = FxRateService(_build_source(FX_SOURCE))
+
+
+def get_rate(currency: str, default: float = 1.0) -> float:
+    return fx_service.rate(currency, default)
+
+
+def convert(amounts, currencies, to: str = 'USD'):
+    return fx_service.convert(amounts, currencies, to)
@@ -0,0 +1,87 @@
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+import fx_rates
+from company_records import CompanyRecord
+from formatting import USD_PER_BILLION
+
+
+def classify_market_caps(market_caps_usd_billion, tiers: Dict[str, float]) -> np.ndarray:
+    """
+    Vectorized classify_market_cap: maps an array of market caps in Billions
+    USD onto tier names. Missing or non-positive caps are "N/A".
+    """
+    values = np.asarray(market_caps_usd_billion, dtype=float)
+    ordered = sorted(tiers.items(), key=lambda tier: tier[1], reverse=True)
+    valid = values > 0  # NaN compares False
+    conditions = [valid & (values >= threshold) for _, threshold in ordered]
+    return np.select(conditions, [name for name, _ in ordered], default='N/A')
+
+
+def classify_companies(raw: pd.DataFrame, tiers: Dict[str, float], default_currency: str = 'USD') -> pd.DataFrame:
+    """
+    Turns raw provider rows (Company Name, Ticker, marketCap, currency, sector,
+    beta, price, previousClose, fiftyTwoWeekLow, fiftyTwoWeekHigh and, for
+    failed fetches, error) into classified rows in one columnar pass: FX
+    conversion, tiering and the daily change run over whole columns. Figures
+    stay numeric (NaN when missing); failed fetches get the "Error" category.
+    """
+    frame = raw.reindex(columns=['Company Name', 'Ticker', 'marketCap', 'currency', 'sector', 'beta', 'price',
+                                 'previousClose', 'fiftyTwoWeekLow', 'fiftyTwoWeekHigh', 'error'])
+    failed = frame['error'].notna().to_numpy()
+
+    native_caps = pd.to_numeric(frame['marketCap'], errors='coerce').to_numpy(dtype=float)
+    currencies = frame['currency'].fillna(default_currency).astype(str).to_numpy()
+    has_cap = ~failed & (native_caps > 0)
+    usd_caps = np.where(has_cap, fx_rates.convert(np.nan_to_num(native_caps), currencies), np.nan)
+    categories = classify_market_caps(usd_caps / USD_PER_BILLION, tiers)
+
+    def numbers(column: str) -> np.ndarray:
+        return pd.to_numeric(frame[column], errors='coerce').to_numpy(dtype=float)
+
+    prices = numbers('price')
+    previous_closes = numbers('previousClose')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        change_percents = np.where(previous_closes > 0, (prices / previous_closes - 1) * 100, np.nan)
+
+    for name, ticker in frame.loc[~failed & ~has_cap, ['Company Name', 'Ticker']].itertuples(index=False):
+        print(f"Warning: Market cap data not available for {name} ({ticker}).")
+
+    return pd.DataFrame({
+        'Company Name': frame['Company Name'].to_numpy(),
+        'Ticker': frame['Ticker'].to_numpy(),
+        'Native Currency': currencies,
+        'Market Cap (Native)': np.where(has_cap, native_caps, np.nan),
+        'Market Cap (USD)': usd_caps,
+        'Category': np.where(failed, 'Error', categories),
+        'Sector': frame['sector'].fillna('N/A').to_numpy(),
+        'Beta': numbers('beta'),
+        'Price': prices,
+        'Change %': change_percents,
+        '52W Low': numbers('fiftyTwoWeekLow'),
+        '52W High': numbers('fiftyTwoWeekHigh'),
+    })
+
+
+def group_by_tier(classified: pd.DataFrame, tiers: Dict[str, float]) -> Dict[str, List[CompanyRecord]]:
+    """
+    Builds the get_company_database structure, {tier: [CompanyRecord, ...]},
+    from classify_companies output. Companies keep their input order within a
+    tier; companies without a tier (no market cap, failed fetch) are left out.
+    """
+    # In CompanyRecord argument order
+    columns = ['Company Name', 'Ticker', 'Native Currency', 'Market Cap (Native)', 'Market Cap (USD)',
+               'Category', 'Sector', 'Beta', 'Price', 'Change %', '52W Low', '52W High']
+    rows = classified[columns]
+    # Missing numbers travel as None rather than NaN, which is not valid JSON
+    rows = rows.astype(object).where(rows.notna(), None)
+
+    db: Dict[str, List[CompanyRecord]] = {tier: [] for tier in tiers}
+    # Zipping plain column lists is several times faster than iterating the frame
+    for values in zip(*(rows[c].tolist() for c in columns)):
+        records = db.get(values[5])
+        if records is not None:
+            records.append(CompanyRecord(*values))
+    return db
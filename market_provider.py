@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import io
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from metrics import upstream_call
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# --- Configuration for Market Data Providers ---
+
+# Which backend serves market data: "yfinance", "replay" or "record"
+PROVIDER_NAME = os.getenv("FINVISER_MARKET_PROVIDER", "yfinance")
+
+# Directory holding recorded info/history payloads for replay and record modes
+REPLAY_DIR = os.getenv(
+    "FINVISER_REPLAY_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "market_data"),
+)
+
+# Synthetic latency added to every replayed call, in milliseconds
+REPLAY_LATENCY_MS = float(os.getenv("FINVISER_REPLAY_LATENCY_MS", "0"))
+
+
+class MarketDataNotFound(LookupError):
+    """Raised when a provider has no data for the requested symbol."""
+
+
+class MarketDataProvider(ABC):
+    """
+    Interface every market data path goes through.
+
+    get_info returns the Yahoo-style info dict for a symbol and get_history
+    returns an OHLC DataFrame indexed by timestamp. get_history_since returns
+    the bars from `start` onwards, or the whole history when start is None.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def get_info(self, symbol: str) -> Dict[str, Any]:
+        ...
+
+    @abstractmethod
+    def get_history(self, symbol: str, period: str = "1mo", interval: str = "1d") -> pd.DataFrame:
+        ...
+
+    @abstractmethod
+    def get_history_since(self, symbol: str, start: Optional[datetime], interval: str = "1d") -> pd.DataFrame:
+        ...
+
+
+class YFinanceProvider(MarketDataProvider):
+    """Live data straight from Yahoo Finance. Every call is timed into metrics."""
+
+    name = "yfinance"
+
+    def get_info(self, symbol: str) -> Dict[str, Any]:
+        import yfinance as yf
+        with upstream_call("yfinance_info", symbol):
+            return yf.Ticker(symbol).info
+
+    def get_history(self, symbol: str, period: str = "1mo", interval: str = "1d") -> pd.DataFrame:
+        import yfinance as yf
+        with upstream_call("yfinance_history", symbol):
+            return yf.Ticker(symbol).history(period=period, interval=interval)
+
+    def get_history_since(self, symbol: str, start: Optional[datetime], interval: str = "1d") -> pd.DataFrame:
+        import yfinance as yf
+        with upstream_call("yfinance_history", symbol):
+            if start is None:
+                return yf.Ticker(symbol).history(period="max", interval=interval)
+            return yf.Ticker(symbol).history(start=start, interval=interval)
+
+
+def _info_path(directory: str, symbol: str) -> str:
+    return os.path.join(directory, symbol.upper(), "info.json")
+
+
+def _history_path(directory: str, symbol: str, period: str, interval: str) -> str:
+    return os.path.join(directory, symbol.upper(), f"history_{period}_{interval}.json")
+
+
+class ReplayProvider(MarketDataProvider):
+    """
+    Serves recorded info/history payloads from local files, optionally sleeping
+    latency_ms per call to imitate a remote provider. Never touches the network.
+    """
+
+    name = "replay"
+
+    def __init__(self, directory: str = REPLAY_DIR, latency_ms: float = REPLAY_LATENCY_MS):
+        self.directory = directory
+        self.latency_ms = latency_ms
+
+    def get_info(self, symbol: str) -> Dict[str, Any]:
+        self._sleep()
+        path = _info_path(self.directory, symbol)
+        if not os.path.exists(path):
+            raise MarketDataNotFound(f"No recorded info for {symbol}")
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def get_history(self, symbol: str, period: str = "1mo", interval: str = "1d") -> pd.DataFrame:
+        import pandas as pd
+        self._sleep()
+        path = _history_path(self.directory, symbol, period, interval)
+        if not os.path.exists(path):
+            path = self._any_history(symbol, interval)
+        if path is None:
+            # Yahoo returns an empty frame for unknown history, so do the same
+            return pd.DataFrame(columns=["Open", "High", "Low", "Close", "Volume"])
+        with open(path, encoding="utf-8") as f:
+            return pd.read_json(io.StringIO(f.read()), orient="split", dtype=False)
+
+    def get_history_since(self, symbol: str, start: Optional[datetime], interval: str = "1d") -> pd.DataFrame:
+        """
+        Serves the interval's recording (a full "max" one when present),
+        cut at start.
+        """
+        import pandas as pd
+        hist = self.get_history(symbol, period="max", interval=interval)
+        if start is None or hist.empty:
+            return hist
+        index = pd.DatetimeIndex(pd.to_datetime(hist.index, utc=True))
+        return hist[index >= pd.Timestamp(start).tz_convert("UTC")]
+
+    def _any_history(self, symbol: str, interval: str) -> Optional[str]:
+        """
+        Falls back to any recording for the same interval when the exact period
+        was never recorded.
+        """
+        folder = os.path.join(self.directory, symbol.upper())
+        if not os.path.isdir(folder):
+            return None
+        suffix = f"_{interval}.json"
+        for file_name in sorted(os.listdir(folder)):
+            if file_name.startswith("history_") and file_name.endswith(suffix):
+                return os.path.join(folder, file_name)
+        return None
+
+    def _sleep(self) -> None:
+        if self.latency_ms > 0:
+            time.sleep(self.latency_ms / 1000.0)
+
+
+class RecordingProvider(MarketDataProvider):
+    """
+    Wraps another provider and writes every payload it returns to disk in the
+    layout ReplayProvider reads.
+    """
+
+    name = "record"
+
+    def __init__(self, inner: MarketDataProvider, directory: str = REPLAY_DIR):
+        self.inner = inner
+        self.directory = directory
+        self._lock = threading.Lock()
+
+    def get_info(self, symbol: str) -> Dict[str, Any]:
+        info = self.inner.get_info(symbol)
+        self._write(_info_path(self.directory, symbol), json.dumps(info, default=str))
+        return info
+
+    def get_history(self, symbol: str, period: str = "1mo", interval: str = "1d") -> pd.DataFrame:
+        hist = self.inner.get_history(symbol, period=period, interval=interval)
+        self._write(
+            _history_path(self.directory, symbol, period, interval),
+            hist.to_json(orient="split", date_format="iso"),
+        )
+        return hist
+
+    def get_history_since(self, symbol: str, start: Optional[datetime], interval: str = "1d") -> pd.DataFrame:
+        hist = self.inner.get_history_since(symbol, start, interval=interval)
+        if start is None:
+            # Only complete histories are recorded; partial tails would overwrite them
+            self._write(
+                _history_path(self.directory, symbol, "max", interval),
+                hist.to_json(orient="split", date_format="iso"),
+            )
+        return hist
+
+    def _write(self, path: str, payload: str) -> None:
+        with self._lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(payload)
+
+
+def _build_provider(name: str) -> MarketDataProvider:
+    if name == "replay":
+        return ReplayProvider()
+    if name == "record":
+        return RecordingProvider(YFinanceProvider())
+    return YFinanceProvider()
+
+
+_provider: Optional[MarketDataProvider] = None
+_provider_lock = threading.Lock()
+
+
+def get_provider() -> MarketDataProvider:
+    """
+    Returns the process-wide provider selected by FINVISER_MARKET_PROVIDER.
+    """
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                _provider = _build_provider(PROVIDER_NAME)
+    return _provider
+
+
+def set_provider(provider: MarketDataProvider) -> None:
+    """
+    Swaps the process-wide provider, e.g. for benchmarks or offline runs.
+    """
+    global _provider
+    with _provider_lock:
+        _provider = provider
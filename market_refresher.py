@@ -0,0 +1,182 @@
+import functools
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+from company_records import CompanyRecord
+from data_cache import company_db_cache
+from fetch_engine import fetch_concurrently
+from quote_cache import quote_cache
+
+
+# --- Configuration for Background Refreshing ---
+
+# Set to "0" to keep all upstream I/O inline in request handlers
+BACKGROUND_REFRESH = os.getenv("FINVISER_BACKGROUND_REFRESH", "1") == "1"
+
+# Seconds between refreshes of each regional database and the tracked quotes
+REFRESH_SECONDS = float(os.getenv("FINVISER_REFRESH_SECONDS", "120"))
+
+# Longest a failing job waits before it is retried
+MAX_BACKOFF_SECONDS = float(os.getenv("FINVISER_REFRESH_MAX_BACKOFF", "900"))
+
+# Tickers users asked for recently; the least recently requested are dropped first
+MAX_TRACKED_TICKERS = int(os.getenv("FINVISER_MAX_TRACKED_TICKERS", "200"))
+
+# Seconds a ticker keeps being refreshed after its last request
+TRACKED_TICKER_TTL = float(os.getenv("FINVISER_TRACKED_TICKER_TTL", "1800"))
+
+QUOTES_JOB = "QUOTES"
+
+
+def _region_builders() -> Dict[str, Callable[[], Dict[str, List[CompanyRecord]]]]:
+    import region_engine
+
+    return {key: functools.partial(region_engine.build_company_database, key) for key in region_engine.REGIONS}
+
+
+class JobStats:
+    """Refresh timing and failure counters for one job."""
+
+    def __init__(self):
+        self.runs = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.last_duration_ms: Optional[float] = None
+        self.last_success: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.next_run = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "last_duration_ms": self.last_duration_ms,
+            "last_success": self.last_success,
+            "last_error": self.last_error,
+            "next_run_in": round(max(0.0, self.next_run - time.monotonic()), 1),
+        }
+
+
+class MarketRefresher:
+    """
+    Daemon thread that keeps the shared caches warm so request handlers only
+    read: it rebuilds each regional company database and re-fetches quotes for
+    recently requested tickers every `interval` seconds. A failing job backs off
+    exponentially, and its last good data keeps being served meanwhile.
+    """
+
+    def __init__(self, interval: float = REFRESH_SECONDS, max_backoff: float = MAX_BACKOFF_SECONDS):
+        self.interval = interval
+        self.max_backoff = max_backoff
+        self._lock = threading.Lock()
+        self._tracked: "OrderedDict[str, float]" = OrderedDict()
+        self._stats: Dict[str, JobStats] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def track(self, symbol: str) -> None:
+        """
+        Marks symbol as requested so its quote is kept fresh in the background.
+        """
+        with self._lock:
+            self._tracked[symbol.upper()] = time.monotonic()
+            self._tracked.move_to_end(symbol.upper())
+            while len(self._tracked) > MAX_TRACKED_TICKERS:
+                self._tracked.popitem(last=False)
+
+    def tracked_tickers(self) -> List[str]:
+        cutoff = time.monotonic() - TRACKED_TICKER_TTL
+        with self._lock:
+            for symbol in [s for s, seen in self._tracked.items() if seen < cutoff]:
+                del self._tracked[symbol]
+            return list(self._tracked)
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="finviser-refresher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def run_once(self, force: bool = False) -> None:
+        """
+        Runs every job that is due (or all of them when force is set).
+        """
+        for region, build in _region_builders().items():
+            self._run_job(region, lambda: self._refresh_region(region, build), force)
+        self._run_job(QUOTES_JOB, self._refresh_quotes, force)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            jobs = {name: stats.as_dict() for name, stats in self._stats.items()}
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "interval": self.interval,
+            "tracked_tickers": len(self._tracked),
+            "jobs": jobs,
+        }
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Error in background refresher: {e}")
+            self._stop.wait(1.0)
+
+    def _run_job(self, name: str, job: Callable[[], None], force: bool) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(name, JobStats())
+            if not force and time.monotonic() < stats.next_run:
+                return
+
+        started = time.monotonic()
+        error = None
+        try:
+            job()
+        except Exception as e:
+            error = e
+
+        with self._lock:
+            stats.runs += 1
+            stats.last_duration_ms = round((time.monotonic() - started) * 1000, 1)
+            if error is None:
+                stats.consecutive_failures = 0
+                stats.last_success = time.time()
+                stats.next_run = time.monotonic() + self.interval
+            else:
+                stats.failures += 1
+                stats.consecutive_failures += 1
+                stats.last_error = str(error)
+                backoff = min(self.interval * (2 ** stats.consecutive_failures), self.max_backoff)
+                stats.next_run = time.monotonic() + backoff
+        if error is not None:
+            print(f"Background refresh of {name} failed, retrying in {backoff:.0f}s: {error}")
+
+    def _refresh_region(self, region: str, build: Callable[[], Dict[str, List[CompanyRecord]]]) -> None:
+        database = build()
+        if not any(database.values()):
+            # Every ticker failed: the provider is down, keep serving the last good data
+            raise RuntimeError(f"No company data returned for {region}")
+        company_db_cache.put(region, database)
+
+    def _refresh_quotes(self) -> None:
+        tickers = self.tracked_tickers()
+        if not tickers:
+            return
+        results = fetch_concurrently(tickers, quote_cache.refresh_info, lambda t, e: e)
+        errors = [r for r in results if isinstance(r, Exception)]
+        if len(errors) == len(tickers):
+            raise RuntimeError(f"All {len(tickers)} quote refreshes failed: {errors[0]}")
+
+
+market_refresher = MarketRefresher()
@@ -0,0 +1,219 @@
+import json
+import math
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+# --- Configuration for Latency Metrics ---
+
+# Timed calls and requests at least this slow (in milliseconds) are written
+# to the structured log, as are all failures; 0 logs every one, a negative
+# value turns the log off
+TIMING_LOG_MS = float(os.getenv("FINVISER_TIMING_LOG_MS", "1000"))
+
+# Distinct tickers given their own label; the rest are counted as "other" so a
+# full-exchange refresh cannot blow up the number of series
+MAX_TICKER_LABELS = int(os.getenv("FINVISER_METRICS_MAX_TICKERS", "500"))
+
+# Histogram bucket upper bounds, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _label_text(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """
+    A labelled latency histogram in the Prometheus sense: cumulative bucket
+    counts, a sum and a count per label set, plus a count of observations
+    that ended in an error (exported as <name minus _seconds>_errors_total).
+    """
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...],
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        # label values -> [per-bucket counts (last is +Inf), sum, errors]
+        self._series: Dict[Tuple[str, ...], List[Any]] = {}
+
+    def observe(self, seconds: float, error: bool = False, **labels: str) -> None:
+        key = tuple(str(labels.get(name, '')) for name in self.labels)
+        slot = bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][slot] += 1
+            series[1] += seconds
+            if error:
+                series[2] += 1
+
+    def snapshot(self) -> Dict[Tuple[str, ...], Tuple[List[int], float, int]]:
+        with self._lock:
+            return {key: (list(counts), total, errors) for key, (counts, total, errors) in self._series.items()}
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        errors_name = self.name[:-len("_seconds")] if self.name.endswith("_seconds") else self.name
+        errors_name += "_errors_total"
+        error_lines = [f"# HELP {errors_name} Failed observations of {self.name}.", f"# TYPE {errors_name} counter"]
+        for key, (counts, total, errors) in sorted(self.snapshot().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = 'le="' + _number(bound) + '"'
+                lines.append(f"{self.name}_bucket{_label_text(self.labels, key, le)} {cumulative}")
+            labels = _label_text(self.labels, key)
+            lines.append(f"{self.name}_sum{labels} {_number(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+            error_lines.append(f"{errors_name}{labels} {errors}")
+        return lines + error_lines
+
+
+upstream_seconds = Histogram(
+    "finviser_upstream_call_seconds",
+    "Latency of calls to Yahoo Finance, the FX source and Gemini.",
+    ("call", "ticker"),
+)
+region_build_seconds = Histogram(
+    "finviser_region_build_seconds",
+    "Time to fetch and classify a region's whole company database.",
+    ("region",),
+)
+request_seconds = Histogram(
+    "finviser_http_request_seconds",
+    "Time until a route's response is ready to send (the first event for streams).",
+    ("method", "route", "status"),
+)
+template_seconds = Histogram(
+    "finviser_template_render_seconds",
+    "Jinja template render time.",
+    ("template",),
+)
+
+HISTOGRAMS = (upstream_seconds, region_build_seconds, request_seconds, template_seconds)
+
+_ticker_lock = threading.Lock()
+_ticker_labels = set()
+
+
+def ticker_label(ticker: Optional[str]) -> str:
+    """
+    The ticker itself for the first MAX_TICKER_LABELS tickers seen, "other" after.
+    """
+    if not ticker:
+        return ''
+    ticker = ticker.upper()
+    with _ticker_lock:
+        if ticker in _ticker_labels:
+            return ticker
+        if len(_ticker_labels) < MAX_TICKER_LABELS:
+            _ticker_labels.add(ticker)
+            return ticker
+    return "other"
+
+
+def log_timing(event: str, seconds: float, error: Optional[BaseException] = None, **fields: Any) -> None:
+    """
+    Writes one JSON line for a slow or failed operation, e.g.
+    {"event": "upstream_call", "duration_ms": 1840.2, "call": "yfinance_info", "ticker": "AAPL"}.
+    """
+    if TIMING_LOG_MS < 0 or (error is None and seconds * 1000 < TIMING_LOG_MS):
+        return
+    record = {"ts": round(time.time(), 3), "event": event, "duration_ms": round(seconds * 1000, 1)}
+    record.update(fields)
+    if error is not None:
+        record["error"] = f"{type(error).__name__}: {error}"
+    # One write per line, so lines from concurrent threads do not interleave
+    sys.stdout.write(json.dumps(record, default=str) + "\n")
+    sys.stdout.flush()
+
+
+@contextmanager
+def timed(histogram: Histogram, event: str, details: Optional[Dict[str, Any]] = None,
+          **labels: str) -> Iterator[None]:
+    """
+    Times the block into histogram (with its error count on an exception)
+    and logs it when slow or failed; details override labels in the log line.
+    """
+    started = time.perf_counter()
+    error: Optional[BaseException] = None
+    try:
+        yield
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        histogram.observe(elapsed, error=error is not None and not isinstance(error, GeneratorExit), **labels)
+        log_timing(event, elapsed, error if isinstance(error, Exception) else None, **{**labels, **(details or {})})
+
+
+def upstream_call(call: str, ticker: Optional[str] = None):
+    """
+    timed() for one upstream call, e.g. `with upstream_call("yfinance_info", symbol):`.
+    """
+    # The log line keeps the real ticker even once the label has become "other"
+    return timed(upstream_seconds, "upstream_call", {"ticker": ticker or ''}, call=call, ticker=ticker_label(ticker))
+
+
+def record_request(method: str, route: str, path: str, status: int, seconds: float) -> None:
+    """
+    Records one served request; route is the pattern ("/api/stock/<ticker>"), path the actual URL path.
+    """
+    request_seconds.observe(seconds, error=status >= 500, method=method, route=route, status=str(status))
+    log_timing("http_request", seconds, method=method, route=route, path=path, status=status)
+
+
+def render(stats: Optional[Dict[str, Dict[str, Any]]] = None) -> str:
+    """
+    Every histogram in the Prometheus text format, followed by the numeric
+    fields of `stats` ({component: stats() dict}) as finviser_<field>{component=...}
+    gauges, with a hit ratio added for components counting hits and misses.
+    """
+    lines: List[str] = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+
+    gauges: Dict[str, List[str]] = {}
+    for component, values in (stats or {}).items():
+        values = dict(values)
+        if "hits" in values and "misses" in values and "hit_ratio" not in values:
+            served = values["hits"] + values.get("stale_hits", 0)
+            total = served + values["misses"]
+            values["hit_ratio"] = round(served / total, 4) if total else 0.0
+        for field, value in values.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            gauges.setdefault(f"finviser_{field}", []).append(
+                f'finviser_{field}{{component="{_escape(component)}"}} {_number(value)}'
+            )
+    for name, samples in gauges.items():
+        lines.append(f"# TYPE {name} gauge")
+        lines.extend(samples)
+    return "\n".join(lines) + "\n"
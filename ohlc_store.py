@@ -0,0 +1,307 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Any, Dict, Iterator, Optional, Tuple
+
+from data_cache import SingleFlight
+from market_provider import get_provider
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# --- Configuration for the Incremental OHLC Store ---
+
+# Seconds before the newest bars of an intraday / daily series are re-fetched
+OHLC_INTRADAY_TTL = float(os.getenv("FINVISER_OHLC_INTRADAY_TTL", "60"))
+OHLC_DAILY_TTL = float(os.getenv("FINVISER_OHLC_DAILY_TTL", "300"))
+
+# Maximum number of (symbol, interval) series kept in memory
+OHLC_CAPACITY = int(os.getenv("FINVISER_OHLC_CAPACITY", "1024"))
+
+# SQLite file the bars are kept in across restarts; empty keeps them in memory only
+OHLC_PATH = os.getenv(
+    "FINVISER_OHLC_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "instance", "ohlc_bars.sqlite3"),
+)
+
+OHLC_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+# Dashboard period -> (bar interval, span back from the newest bar, None for
+# everything). Spans start at midnight, so a zero span is the latest session.
+PERIODS: Dict[str, Tuple[str, Optional[timedelta]]] = {
+    '1D': ("5m", timedelta(0)),
+    '1W': ("1h", timedelta(days=7)),
+    '1M': ("1d", timedelta(days=31)),
+    '3M': ("1d", timedelta(days=92)),
+    '1Y': ("1d", timedelta(days=366)),
+    '5Y': ("1d", timedelta(days=5 * 366)),
+    'MAX': ("1d", None),
+}
+
+# How far back Yahoo Finance serves each intraday interval
+INTERVAL_LIMITS = {"5m": timedelta(days=59), "1h": timedelta(days=729)}
+
+# Extra history fetched before a window so weekends and holidays never cut it short
+FETCH_MARGIN = timedelta(days=5)
+
+
+class _Series:
+    """
+    The stored bars of one (symbol, interval): everything since covered_from
+    (a Unix time, None once the full history is stored), last updated at
+    fetched_at.
+    """
+
+    def __init__(self, bars: pd.DataFrame, covered_from: Optional[float], fetched_at: float):
+        self.bars = bars
+        self.covered_from = covered_from
+        self.fetched_at = fetched_at
+
+    def covers(self, start: Optional[float]) -> bool:
+        if self.covered_from is None:
+            return True
+        return start is not None and self.covered_from <= start
+
+
+class OhlcStore:
+    """
+    Per-ticker OHLC bars, fetched once and then kept current by asking the
+    provider only for the bars after the newest stored one.
+
+    Every dashboard period is a slice of one stored series per interval: the
+    daily series that served 1M also serves 3M, 1Y and 5Y, and after MAX has
+    been loaded once no daily range costs more than a tail fetch. Bars are
+    written through to SQLite, so a restarted worker resumes from its last bar.
+    """
+
+    def __init__(self, path: str = OHLC_PATH, capacity: int = OHLC_CAPACITY):
+        self.path = path
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._series: "OrderedDict[Tuple[str, str], _Series]" = OrderedDict()
+        self._flight = SingleFlight()
+        self._db_lock = threading.Lock()
+        self._db_ready = False
+        self._counters = {
+            "hits": 0, "tail_fetches": 0, "full_fetches": 0, "fetch_errors": 0,
+            "bars_fetched": 0, "disk_loads": 0, "evictions": 0,
+        }
+
+    def get_bars(self, symbol: str, period: str = '1M') -> pd.DataFrame:
+        """
+        Returns the OHLC bars of `period` (a PERIODS key) for symbol, oldest first.
+        """
+        interval, span = PERIODS[period]
+        start = None if span is None else time.time() - (span + FETCH_MARGIN).total_seconds()
+        series = self._current(symbol.upper(), interval, start)
+        return _window(series.bars, span)
+
+    def invalidate(self, symbol: Optional[str] = None) -> None:
+        """
+        Drops series from memory; the persisted bars are kept and reused.
+        """
+        with self._lock:
+            for key in [k for k in self._series if symbol is None or k[0] == symbol.upper()]:
+                del self._series[key]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._counters)
+            stats["series"] = len(self._series)
+        stats["capacity"] = self.capacity
+        stats["coalesced"] = self._flight.shared
+        stats["persistent"] = bool(self.path)
+        return stats
+
+    def _current(self, symbol: str, interval: str, start: Optional[float]) -> _Series:
+        key = (symbol, interval)
+        with self._lock:
+            series = self._series.get(key)
+            if series is not None and series.covers(start) and not self._expired(series, interval):
+                self._series.move_to_end(key)
+                self._counters["hits"] += 1
+                return series
+        series = self._flight.do(key, lambda: self._update(key, start))
+        if not series.covers(start):
+            # Joined a concurrent update that fetched a shorter window than this caller needs
+            series = self._flight.do(key, lambda: self._update(key, start))
+        return series
+
+    def _expired(self, series: _Series, interval: str) -> bool:
+        ttl = OHLC_INTRADAY_TTL if interval in INTERVAL_LIMITS else OHLC_DAILY_TTL
+        return time.time() - series.fetched_at >= ttl
+
+    def _update(self, key: Tuple[str, str], start: Optional[float]) -> _Series:
+        symbol, interval = key
+        with self._lock:
+            series = self._series.get(key)
+        if series is None:
+            series = self._load(key)
+
+        now = time.time()
+        limit = INTERVAL_LIMITS.get(interval)
+        earliest = None if limit is None else now - limit.total_seconds()
+        if series is not None and earliest is not None and not series.bars.empty \
+                and series.bars.index[-1].timestamp() < earliest:
+            series = None  # the gap to the last stored bar is older than Yahoo serves
+
+        if series is None or series.bars.empty or not series.covers(start):
+            fetch_from = start if earliest is None else max(start or earliest, earliest)
+            counter = "full_fetches"
+        else:
+            fetch_from = series.bars.index[-1].timestamp()  # refetch the last bar, it may still be forming
+            counter = "tail_fetches"
+
+        try:
+            since = None if fetch_from is None else datetime.fromtimestamp(fetch_from, tz=timezone.utc)
+            fetched = _normalize(get_provider().get_history_since(symbol, since, interval=interval))
+        except Exception as e:
+            if series is None:
+                raise
+            print(f"Error updating {interval} bars for {symbol}, serving stored bars: {e}")
+            with self._lock:
+                self._counters["fetch_errors"] += 1
+            return series
+
+        covered_from = fetch_from
+        if counter == "tail_fetches":
+            covered_from = series.covered_from
+        elif series is not None and series.covered_from is not None and fetch_from is not None:
+            covered_from = min(series.covered_from, fetch_from)
+
+        merged = _Series(_merge(series.bars if series is not None else None, fetched), covered_from, now)
+        self._save(key, merged, fetched)
+        with self._lock:
+            self._counters[counter] += 1
+            self._counters["bars_fetched"] += len(fetched)
+            self._series[key] = merged
+            self._series.move_to_end(key)
+            while len(self._series) > self.capacity:
+                self._series.popitem(last=False)
+                self._counters["evictions"] += 1
+        return merged
+
+    def _load(self, key: Tuple[str, str]) -> Optional[_Series]:
+        if not self.path:
+            return None
+        import pandas as pd
+        try:
+            with self._connect() as conn:
+                meta = conn.execute(
+                    "SELECT tz, covered_from, fetched_at FROM ohlc_series WHERE symbol = ? AND interval = ?", key
+                ).fetchone()
+                if meta is None:
+                    return None
+                rows = conn.execute(
+                    "SELECT ts, open, high, low, close, volume FROM ohlc_bars"
+                    " WHERE symbol = ? AND interval = ? ORDER BY ts", key
+                ).fetchall()
+        except sqlite3.Error as e:
+            print(f"Error loading stored bars for {key[0]}: {e}")
+            return None
+
+        tz, covered_from, fetched_at = meta
+        frame = pd.DataFrame(rows, columns=["ts"] + OHLC_COLUMNS)
+        index = pd.DatetimeIndex(pd.to_datetime(frame.pop("ts"), unit="s", utc=True)).as_unit("ns").tz_convert(tz)
+        frame = frame.astype(float).set_axis(index.rename(None))
+        with self._lock:
+            self._counters["disk_loads"] += 1
+        return _Series(frame, covered_from, fetched_at)
+
+    def _save(self, key: Tuple[str, str], series: _Series, fetched: pd.DataFrame) -> None:
+        """
+        Writes only the fetched bars; bars already on disk are not rewritten.
+        """
+        if not self.path:
+            return
+        seconds = (fetched.index.asi8 // 1_000_000_000).tolist()
+        columns = [fetched[c].tolist() for c in OHLC_COLUMNS]
+        rows = [key + (ts,) + values for ts, values in zip(seconds, zip(*columns))]
+        try:
+            with self._connect() as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO ohlc_bars (symbol, interval, ts, open, high, low, close, volume)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO ohlc_series (symbol, interval, tz, covered_from, fetched_at)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    key + (str(series.bars.index.tz), series.covered_from, series.fetched_at),
+                )
+        except sqlite3.Error as e:
+            print(f"Error storing bars for {key[0]}: {e}")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        with self._db_lock:
+            if not self._db_ready:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                conn = sqlite3.connect(self.path, timeout=10)
+                try:
+                    with conn:
+                        conn.execute("PRAGMA journal_mode=WAL")
+                        conn.execute(
+                            "CREATE TABLE IF NOT EXISTS ohlc_series ("
+                            " symbol TEXT NOT NULL, interval TEXT NOT NULL, tz TEXT NOT NULL,"
+                            " covered_from REAL, fetched_at REAL NOT NULL,"
+                            " PRIMARY KEY (symbol, interval))"
+                        )
+                        conn.execute(
+                            "CREATE TABLE IF NOT EXISTS ohlc_bars ("
+                            " symbol TEXT NOT NULL, interval TEXT NOT NULL, ts INTEGER NOT NULL,"
+                            " open REAL, high REAL, low REAL, close REAL, volume REAL,"
+                            " PRIMARY KEY (symbol, interval, ts)) WITHOUT ROWID"
+                        )
+                finally:
+                    conn.close()
+                self._db_ready = True
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+
+def _normalize(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Keeps the OHLC columns of a provider frame, with a tz-aware, sorted,
+    duplicate-free index and no rows missing a close. The index is kept in
+    nanoseconds so asi8 means the same thing for every frame.
+    """
+    import pandas as pd
+    bars = frame.reindex(columns=OHLC_COLUMNS).astype(float)
+    index = pd.DatetimeIndex(pd.to_datetime(bars.index)).as_unit("ns")
+    bars.index = index.tz_localize("UTC") if index.tz is None else index
+    bars = bars[bars["Close"].notna()]
+    return bars[~bars.index.duplicated(keep="last")].sort_index()
+
+
+def _merge(stored: Optional[pd.DataFrame], fetched: pd.DataFrame) -> pd.DataFrame:
+    import pandas as pd
+    if stored is None or stored.empty:
+        return fetched
+    if fetched.empty:
+        return stored
+    fetched = fetched.tz_convert(stored.index.tz)
+    bars = pd.concat([stored[stored.index < fetched.index[0]], fetched])
+    return bars[~bars.index.duplicated(keep="last")].sort_index()
+
+
+def _window(bars: pd.DataFrame, span: Optional[timedelta]) -> pd.DataFrame:
+    if span is None or bars.empty:
+        return bars
+    start = (bars.index[-1] - span).normalize()
+    return bars[bars.index >= start]
+
+
+# Shared by every request handler serving price history
+ohlc_store = OhlcStore()
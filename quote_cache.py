@@ -0,0 +1,93 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from data_cache import SingleFlight
+from market_provider import get_provider
+
+
+# --- Configuration for the Per-Ticker Quote Cache ---
+
+# Seconds quote fields (price, change, market cap...) stay fresh
+QUOTE_TTL = float(os.getenv("FINVISER_QUOTE_TTL", "15"))
+
+# Maximum number of tickers kept before the least recently used one is evicted
+QUOTE_CACHE_CAPACITY = int(os.getenv("FINVISER_QUOTE_CACHE_CAPACITY", "512"))
+
+
+class QuoteCache:
+    """
+    In-memory, per-ticker cache of quote info in front of the active market
+    data provider.
+
+    Identical in-flight upstream requests are de-duplicated, and whole tickers
+    are evicted in LRU order once capacity is exceeded. Price histories are
+    not cached here; ohlc_store keeps them.
+    """
+
+    def __init__(self, capacity: int = QUOTE_CACHE_CAPACITY, quote_ttl: float = QUOTE_TTL):
+        self.capacity = capacity
+        self.quote_ttl = quote_ttl
+        self._lock = threading.Lock()
+        # symbol -> {field key -> (value, fetched_at)}
+        self._tickers: "OrderedDict[str, Dict[Hashable, Any]]" = OrderedDict()
+        self._flight = SingleFlight()
+        self._counters = {"quote_hits": 0, "quote_misses": 0, "evictions": 0}
+
+    def get_info(self, symbol: str) -> Dict[str, Any]:
+        symbol = symbol.upper()
+        return self._get(symbol, "info", self.quote_ttl, "quote",
+                         lambda: get_provider().get_info(symbol))
+
+    def refresh_info(self, symbol: str) -> Dict[str, Any]:
+        """
+        Reloads quote info for symbol from upstream regardless of its age.
+        """
+        symbol = symbol.upper()
+        return self._flight.do((symbol, "info"),
+                               lambda: self._store(symbol, "info", get_provider().get_info(symbol)))
+
+    def invalidate(self, symbol: Optional[str] = None) -> None:
+        with self._lock:
+            if symbol is None:
+                self._tickers.clear()
+            else:
+                self._tickers.pop(symbol.upper(), None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._counters)
+            stats["tickers"] = len(self._tickers)
+        stats["capacity"] = self.capacity
+        stats["coalesced"] = self._flight.shared
+        total = stats["quote_hits"] + stats["quote_misses"]
+        stats["quote_hit_ratio"] = round(stats["quote_hits"] / total, 4) if total else 0.0
+        return stats
+
+    def _get(self, symbol: str, field: Hashable, ttl: float, kind: str, loader: Callable[[], Any]) -> Any:
+        with self._lock:
+            fields = self._tickers.get(symbol)
+            entry = fields.get(field) if fields is not None else None
+            if entry is not None and time.monotonic() - entry[1] < ttl:
+                self._tickers.move_to_end(symbol)
+                self._counters[f"{kind}_hits"] += 1
+                return entry[0]
+            self._counters[f"{kind}_misses"] += 1
+
+        return self._flight.do((symbol, field), lambda: self._store(symbol, field, loader()))
+
+    def _store(self, symbol: str, field: Hashable, value: Any) -> Any:
+        with self._lock:
+            fields = self._tickers.setdefault(symbol, {})
+            fields[field] = (value, time.monotonic())
+            self._tickers.move_to_end(symbol)
+            while len(self._tickers) > self.capacity:
+                self._tickers.popitem(last=False)
+                self._counters["evictions"] += 1
+        return value
+
+
+# Shared by every request handler serving single-ticker quotes
+quote_cache = QuoteCache()
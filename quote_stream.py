@@ -0,0 +1,218 @@
+import asyncio
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Set
+
+from fetch_engine import fetch_concurrently
+from quote_cache import quote_cache
+
+
+# --- Configuration for Live Quote Streaming ---
+
+# Seconds between polls of the subscribed tickers; every ticker is polled once
+# per round however many clients follow it
+STREAM_POLL_SECONDS = float(os.getenv("FINVISER_STREAM_POLL_SECONDS", "5"))
+
+# Seconds between keep-alive comments on an idle stream
+STREAM_HEARTBEAT_SECONDS = float(os.getenv("FINVISER_STREAM_HEARTBEAT_SECONDS", "15"))
+
+# Seconds a quote stream served by the Flask (WSGI) app stays open before it
+# ends and the browser's EventSource reconnects, so an open tab never holds a
+# worker thread for good. Streams served by asgi.py hold no thread and are not cut.
+WSGI_STREAM_MAX_SECONDS = float(os.getenv("FINVISER_WSGI_STREAM_MAX_SECONDS", "300"))
+
+# Milliseconds the browser waits before reconnecting a stream that ended
+STREAM_RETRY_MS = int(os.getenv("FINVISER_STREAM_RETRY_MS", "1000"))
+
+# Quote fields pushed to subscribers; only the ones that changed are sent
+QUOTE_FIELDS = ("price", "change", "changePercent", "volume", "marketCap")
+
+
+def quote_fields(info: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    The streamed subset of a Yahoo-style info dict.
+    """
+    price = info.get('regularMarketPrice')
+    previous_close = info.get('regularMarketPreviousClose')
+    change = change_percent = None
+    if price is not None and previous_close is not None:
+        change = price - previous_close
+        change_percent = (change / previous_close) * 100 if previous_close != 0 else 0
+    return {
+        'price': price,
+        'change': change,
+        'changePercent': change_percent,
+        'volume': info.get('volume'),
+        'marketCap': info.get('marketCap'),
+    }
+
+
+class Subscription:
+    """
+    One client's view of the stream. Updates for the same ticker coalesce, so
+    a slow client only ever receives the latest values instead of a backlog.
+    """
+
+    def __init__(self, hub: "QuoteHub", symbols: Dict[str, str]):
+        self.hub = hub
+        # symbol -> ticker the client asked for (e.g. TCS.NS -> TCS)
+        self.symbols = symbols
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._ready = threading.Condition()
+        self._event_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._async_ready: Optional[asyncio.Event] = None
+        self.closed = False
+
+    def next(self, timeout: float) -> Dict[str, Dict[str, Any]]:
+        """
+        Blocks until updates arrive or timeout passes; returns {ticker: delta},
+        empty on timeout.
+        """
+        with self._ready:
+            if not self._pending:
+                self._ready.wait(timeout)
+            return self._take()
+
+    async def next_async(self, timeout: float) -> Dict[str, Dict[str, Any]]:
+        """
+        next() for the event loop: waits without holding a thread.
+        """
+        if self._async_ready is None:
+            self._async_ready = asyncio.Event()
+            self._event_loop = asyncio.get_running_loop()
+        with self._ready:
+            if self._pending:
+                return self._take()
+        try:
+            await asyncio.wait_for(self._async_ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._async_ready.clear()
+        with self._ready:
+            return self._take()
+
+    def close(self) -> None:
+        self.hub.unsubscribe(self)
+
+    def _push(self, symbol: str, delta: Dict[str, Any]) -> None:
+        with self._ready:
+            self._pending.setdefault(self.symbols[symbol], {}).update(delta)
+            self._ready.notify_all()
+        if self._event_loop is not None and not self.closed:
+            try:
+                self._event_loop.call_soon_threadsafe(self._async_ready.set)
+            except RuntimeError:
+                pass  # the client's event loop has already shut down
+
+    def _take(self) -> Dict[str, Dict[str, Any]]:
+        updates, self._pending = self._pending, {}
+        return updates
+
+
+class QuoteHub:
+    """
+    Fans live quotes out to every subscriber. One poller thread fetches each
+    distinct subscribed symbol once per round through the quote cache, so
+    upstream load grows with the number of tickers followed, not the number
+    of open streams. The thread runs only while someone is subscribed.
+    """
+
+    def __init__(self, interval: float = STREAM_POLL_SECONDS):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._last: Dict[str, Dict[str, Any]] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._wake = threading.Event()
+        self._counters = {"polls": 0, "upstream_fetches": 0, "fetch_errors": 0, "updates_sent": 0}
+
+    def subscribe(self, symbols: Dict[str, str]) -> Subscription:
+        """
+        Subscribes to {symbol: ticker}. The subscriber's first update is the
+        last known quote of every symbol that already has one.
+        """
+        subscription = Subscription(self, dict(symbols))
+        with self._lock:
+            for symbol in subscription.symbols:
+                self._subscribers.setdefault(symbol, set()).add(subscription)
+            known = {symbol: self._last[symbol] for symbol in subscription.symbols if symbol in self._last}
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name="finviser-quote-stream", daemon=True)
+                self._thread.start()
+        for symbol, quote in known.items():
+            subscription._push(symbol, quote)
+        if len(known) < len(subscription.symbols):
+            self._wake.set()  # poll new symbols now rather than at the next round
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscription.closed = True
+            for symbol in subscription.symbols:
+                followers = self._subscribers.get(symbol)
+                if followers is not None:
+                    followers.discard(subscription)
+                    if not followers:
+                        del self._subscribers[symbol]
+                        self._last.pop(symbol, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._counters)
+            stats["symbols"] = len(self._subscribers)
+            stats["subscriptions"] = len({s for followers in self._subscribers.values() for s in followers})
+        stats["interval"] = self.interval
+        return stats
+
+    def poll_once(self) -> None:
+        """
+        Fetches every subscribed symbol once and pushes what changed.
+        """
+        with self._lock:
+            symbols = list(self._subscribers)
+        if not symbols:
+            return
+        results = fetch_concurrently(symbols, quote_cache.refresh_info, lambda s, e: e)
+        with self._lock:
+            self._counters["polls"] += 1
+            self._counters["upstream_fetches"] += len(symbols)
+        for symbol, info in zip(symbols, results):
+            if isinstance(info, Exception):
+                print(f"Error streaming quote for {symbol}: {info}")
+                with self._lock:
+                    self._counters["fetch_errors"] += 1
+                continue
+            self._publish(symbol, quote_fields(info))
+
+    def _publish(self, symbol: str, quote: Dict[str, Any]) -> None:
+        with self._lock:
+            followers = list(self._subscribers.get(symbol, ()))
+            if not followers:
+                return
+            previous = self._last.get(symbol, {})
+            delta = {field: quote[field] for field in QUOTE_FIELDS if previous.get(field) != quote[field]}
+            if not delta:
+                return
+            self._last[symbol] = quote
+            self._counters["updates_sent"] += len(followers)
+        for subscription in followers:
+            subscription._push(symbol, delta)
+
+    def _loop(self) -> None:
+        while True:
+            with self._lock:
+                if not self._subscribers:
+                    self._thread = None
+                    return
+            started = time.monotonic()
+            self._wake.clear()
+            try:
+                self.poll_once()
+            except Exception as e:
+                print(f"Error in quote stream: {e}")
+            self._wake.wait(max(0.0, self.interval - (time.monotonic() - started)))
+
+
+# Shared by every streaming connection of this process
+quote_hub = QuoteHub()
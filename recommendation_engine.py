@@ -0,0 +1,233 @@
+import re
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from company_records import CompanyRecord
+from formatting import format_compact_usd
+
+
+# --- Configuration for Local Recommendations ---
+
+TIERS = ["Small Cap", "Mid Cap", "Large Cap"]
+
+PICKS_PER_TIER = 3
+
+# Beta assumed for companies Yahoo Finance reports none for
+DEFAULT_BETA = 1.0
+
+# Common ways users name a sector, mapped onto Yahoo Finance's sector names
+SECTOR_ALIASES = {
+    'tech': 'technology',
+    'it': 'technology',
+    'software': 'technology',
+    'semiconductors': 'technology',
+    'finance': 'financial services',
+    'financial': 'financial services',
+    'banking': 'financial services',
+    'banks': 'financial services',
+    'insurance': 'financial services',
+    'health': 'healthcare',
+    'pharma': 'healthcare',
+    'biotech': 'healthcare',
+    'auto': 'consumer cyclical',
+    'automotive': 'consumer cyclical',
+    'retail': 'consumer cyclical',
+    'fmcg': 'consumer defensive',
+    'telecom': 'communication services',
+    'media': 'communication services',
+    'oil': 'energy',
+    'gas': 'energy',
+    'materials': 'basic materials',
+    'mining': 'basic materials',
+    'property': 'real estate',
+    'luxury': 'consumer cyclical',
+}
+
+RISK_LEVELS = {'low': 0.0, 'conservative': 0.0, 'medium': 0.5, 'moderate': 0.5, 'high': 1.0, 'aggressive': 1.0}
+
+HORIZON_LEVELS = {'short': 0.0, 'medium': 0.5, 'long': 1.0}
+
+
+def parse_sectors(value: Any) -> List[str]:
+    """
+    Splits a free-text sector answer ("Tech, Healthcare and Finance") into
+    sorted, lower-cased sector names.
+    """
+    parts = re.split(r"[,;/]| and ", str(value or ""))
+    return sorted({" ".join(p.lower().split()) for p in parts if p.strip()})
+
+
+def parse_amount(value: Any) -> Optional[float]:
+    """
+    Reads the first amount out of "$50,000", "50000 USD" or "50k" style
+    answers, or None when there is none.
+    """
+    match = re.search(r"\d[\d,]*(?:\.\d+)?(?:\s*k\b)?", str(value or "").lower())
+    if not match:
+        return None
+    number = match.group()
+    return float(re.sub(r"[,\sk]", "", number)) * (1_000 if number.endswith("k") else 1)
+
+
+def _level(value: Any, levels: Dict[str, float], default: float = 0.5) -> float:
+    text = str(value or "").lower()
+    for word, level in levels.items():
+        if word in text:
+            return level
+    return default
+
+
+def effective_risk(preferences: Dict[str, Any]) -> float:
+    """
+    Risk appetite in [0, 1], scaled down when the user's cash flow leaves
+    little room for losses. Salary and loans are annual, expenses monthly.
+    """
+    risk = _level(preferences.get('risk_appetite'), RISK_LEVELS)
+    salary = parse_amount(preferences.get('salary'))
+    if not salary:
+        return risk
+
+    expenses = (parse_amount(preferences.get('monthly_expense')) or 0.0) * 12
+    loan = parse_amount(preferences.get('loan')) or 0.0
+    savings_rate = np.clip((salary - expenses) / salary, 0.0, 1.0)
+    debt_load = np.clip(loan / salary, 0.0, 1.0)
+    capacity = np.clip(savings_rate - 0.5 * debt_load, 0.0, 1.0)
+    return float(risk * (0.5 + 0.5 * capacity))
+
+
+def companies_frame(database: Dict[str, List[CompanyRecord]]) -> pd.DataFrame:
+    """
+    Flattens a {tier: [CompanyRecord, ...]} database into one row per company.
+    """
+    records = [(tier, record) for tier, companies in database.items() for record in companies]
+    fields = ['name', 'ticker', 'market_cap_usd', 'sector', 'beta']
+    frame = pd.DataFrame({'tier': [tier for tier, _ in records]})
+    for field in fields:
+        frame[field] = [getattr(record, field) for _, record in records]
+    frame['market_cap_usd'] = pd.to_numeric(frame['market_cap_usd'], errors='coerce')
+    frame['beta'] = pd.to_numeric(frame['beta'], errors='coerce')
+    frame['sector'] = frame['sector'].fillna('N/A').astype(str)
+    return frame
+
+
+def score_companies(frame: pd.DataFrame, preferences: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Adds a `score` column (higher is a better fit) and the components behind it.
+
+    Within each tier, companies are compared on size (log market cap,
+    standardised per tier) and volatility (beta). Low risk favours large,
+    low-beta names, high risk favours high-beta names, a long horizon adds
+    weight to size, and a preferred sector outweighs everything else.
+    """
+    risk = effective_risk(preferences)
+    horizon = _level(preferences.get('investment_horizon'), HORIZON_LEVELS)
+
+    scored = frame.copy()
+    log_cap = np.log(scored['market_cap_usd'].where(scored['market_cap_usd'] > 0))
+    by_tier = log_cap.groupby(scored['tier'])
+    size = ((log_cap - by_tier.transform('mean')) / by_tier.transform('std').replace(0, np.nan)).fillna(0.0)
+    volatility = scored['beta'].fillna(DEFAULT_BETA).to_numpy() - DEFAULT_BETA
+
+    sectors = [SECTOR_ALIASES.get(s, s) for s in parse_sectors(preferences.get('preferred_sectors'))]
+    if sectors:
+        pattern = "|".join(re.escape(s) for s in sectors)
+        sector_match = scored['sector'].str.lower().str.contains(pattern, regex=True).to_numpy()
+    else:
+        sector_match = np.zeros(len(scored), dtype=bool)
+
+    scored['size'] = size.to_numpy()
+    scored['sector_match'] = sector_match
+    scored['score'] = (
+        2.0 * sector_match
+        + (1.0 - risk) * (size.to_numpy() - volatility)
+        + risk * volatility
+        + 0.5 * horizon * size.to_numpy()
+    )
+    return scored
+
+
+def recommend(database: Dict[str, List[CompanyRecord]], preferences: Dict[str, Any],
+              per_tier: int = PICKS_PER_TIER) -> Dict[str, pd.DataFrame]:
+    """
+    Returns the best `per_tier` companies of each tier, best first. Ties go to
+    the ticker that sorts first, so the same input always gives the same picks.
+    """
+    scored = score_companies(companies_frame(database), preferences)
+    ranked = scored.sort_values(['score', 'ticker'], ascending=[False, True], kind='mergesort')
+    top = ranked.groupby('tier', sort=False).head(per_tier)
+    return {tier: top[top['tier'] == tier] for tier in TIERS}
+
+
+def shortlist(database: Dict[str, List[CompanyRecord]], preferences: Dict[str, Any],
+              per_tier: int) -> Dict[str, List[CompanyRecord]]:
+    """
+    The database restricted to its `per_tier` best-scoring companies per tier,
+    as the same records.
+    """
+    picks = recommend(database, preferences, per_tier)
+    keep = {tier: set(frame['ticker']) for tier, frame in picks.items()}
+    return {
+        tier: [c for c in companies if c.ticker in keep.get(tier, ())]
+        for tier, companies in database.items()
+    }
+
+
+def _display_cap(company: pd.Series) -> str:
+    return format_compact_usd(company['market_cap_usd'])
+
+
+def _justify(company: pd.Series, risk: float) -> str:
+    reasons = []
+    if company['sector_match']:
+        reasons.append(f"It is in your preferred {company['sector']} sector.")
+    if company['size'] > 0:
+        reasons.append(f"One of the larger, more established names in its tier (market cap {_display_cap(company)}).")
+    elif company['size'] < 0:
+        reasons.append(f"A smaller name in its tier (market cap {_display_cap(company)}) with more room to grow.")
+    else:
+        reasons.append(f"Market cap {_display_cap(company)}.")
+    beta = company['beta']
+    if pd.isna(beta):
+        return " ".join(reasons)
+    if beta < DEFAULT_BETA:
+        fit = "suits" if risk < 0.5 else "steadies a portfolio built for"
+        reasons.append(f"Its below-market volatility (beta {beta:.2f}) {fit} your risk appetite.")
+    else:
+        fit = "matches" if risk >= 0.5 else "should be kept to a small position given"
+        reasons.append(f"Its above-market volatility (beta {beta:.2f}) {fit} your risk appetite.")
+    return " ".join(reasons)
+
+
+def format_recommendations(picks: Dict[str, pd.DataFrame], preferences: Dict[str, Any]) -> str:
+    """
+    Renders recommend() output in the same markdown layout the Gemini answer uses.
+    """
+    risk = effective_risk(preferences)
+    lines = [
+        "### Investment Recommendations",
+        "",
+        "Here are your personalized stock recommendations based on your preferences:",
+    ]
+    for tier in TIERS:
+        lines += ["", f"**{tier} Recommendations**"]
+        frame = picks.get(tier)
+        if frame is None or frame.empty:
+            lines.append("- No companies available in this category.")
+            continue
+        for _, company in frame.iterrows():
+            lines.append(f"- **{company['name']} ({company['ticker']})**: {_justify(company, risk)}")
+    lines += [
+        "",
+        "**Disclaimer**: This is not financial advice. Please consult with a professional financial advisor "
+        "before making any investment decisions.",
+    ]
+    return "\n".join(lines)
+
+
+def generate_local_recommendations(preferences: Dict[str, Any], database: Dict[str, List[CompanyRecord]]) -> str:
+    """
+    Ranks the database in process and returns the markdown answer.
+    """
+    return format_recommendations(recommend(database, preferences), preferences)
@@ -0,0 +1,288 @@
+import os
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+import fx_rates
+from company_records import CompanyRecord
+from data_cache import company_db_cache
+from fetch_engine import fetch_concurrently
+from formatting import USD_PER_BILLION, USD_PER_MILLION, format_usd
+from market_cap_pipeline import classify_companies, group_by_tier
+from market_provider import get_provider
+from metrics import region_build_seconds, timed
+from ohlc_store import PERIODS, ohlc_store
+from ticker_universe import TickerUniverse, get_universe
+
+
+# --- Configuration for Regional Market Data ---
+
+# Classification Tiers (in USD Billions), shared by every region
+TIERS_USD_BILLION = {
+    "Large Cap": 10.0,  # >= $10 billion
+    "Mid Cap": 2.0,     # $2 billion to < $10 billion
+    "Small Cap": 0.0
+}
+
+# Share of a region's companies that may fail to fetch before a rebuild is
+# rejected, so the cache keeps serving the last complete database
+MAX_FAILED_FRACTION = float(os.getenv("FINVISER_MAX_FAILED_FRACTION", "0.5"))
+
+
+class IncompleteDatabaseError(RuntimeError):
+    """
+    A rebuild where too many companies failed to fetch. `database` holds
+    whatever did load, for callers with nothing better to serve.
+    """
+
+    def __init__(self, message: str, database: Dict[str, List[CompanyRecord]]):
+        super().__init__(message)
+        self.database = database
+
+
+class Region:
+    """
+    Everything that differs between regions. The fetch, FX conversion,
+    classification and caching code below is shared.
+    """
+
+    def __init__(self, key: str, name: str, universe_file: str, default_currency: str = 'USD',
+                 display_unit: int = USD_PER_BILLION, symbol_suffix: str = '',
+                 aliases: Tuple[str, ...] = ()):
+        self.key = key
+        self.name = name
+        self.universe_file = universe_file
+        self.default_currency = default_currency
+        self.display_unit = display_unit
+        self.display_column = (
+            'Current Market Value ($ Million)' if display_unit == USD_PER_MILLION
+            else 'Current Market Value ($ Billion)'
+        )
+        # Appended to bare tickers outside the universe, e.g. "TCS" -> "TCS.NS"
+        self.symbol_suffix = symbol_suffix
+        # Other names the region goes by, e.g. the dashboard's session values
+        self.aliases = aliases
+
+    @property
+    def universe(self) -> TickerUniverse:
+        return get_universe(self.key, self.universe_file)
+
+    def company_map(self) -> Dict[str, str]:
+        return self.universe.company_map()
+
+
+# The region registry. Adding a region is one entry here plus its universe file.
+REGIONS: Dict[str, Region] = {
+    "USA": Region("USA", "USA", "usa", aliases=("NA",)),
+    "EU": Region("EU", "EU", "europe", aliases=("EUROPE",)),
+    "INDIA": Region("INDIA", "India", "india", default_currency='INR', display_unit=USD_PER_MILLION,
+                    symbol_suffix='.NS'),
+}
+
+
+def get_region(name: Optional[str]) -> Optional[Region]:
+    """
+    Looks a region up by key ("USA") or alias ("NA"); None when unknown.
+    """
+    name = (name or '').upper()
+    if name in REGIONS:
+        return REGIONS[name]
+    for region in REGIONS.values():
+        if name in region.aliases:
+            return region
+    return None
+
+
+def classify_market_cap(market_cap_usd_billion: float) -> str:
+    """
+    Classifies a company based on its market capitalization in Billions USD.
+    """
+    if market_cap_usd_billion >= TIERS_USD_BILLION["Large Cap"]:
+        return "Large Cap"
+    elif market_cap_usd_billion >= TIERS_USD_BILLION["Mid Cap"]:
+        return "Mid Cap"
+    else:
+        return "Small Cap"
+
+
+def _fetch_company_info(company: Tuple[str, str]) -> Dict[str, Any]:
+    """
+    Fetches the raw provider fields needed to classify a single (name, ticker) pair.
+    """
+    name, ticker = company
+    info = get_provider().get_info(ticker)
+    return {
+        'Company Name': name,
+        'Ticker': ticker,
+        'marketCap': info.get('marketCap'),
+        'currency': info.get('currency'),
+        'sector': info.get('sector'),
+        'beta': info.get('beta'),
+        'price': info.get('regularMarketPrice') or info.get('currentPrice'),
+        'previousClose': info.get('regularMarketPreviousClose') or info.get('previousClose'),
+        'fiftyTwoWeekLow': info.get('fiftyTwoWeekLow'),
+        'fiftyTwoWeekHigh': info.get('fiftyTwoWeekHigh'),
+    }
+
+
+def _error_row(company: Tuple[str, str], e: Exception) -> Dict[str, Any]:
+    name, ticker = company
+    print(f"Error fetching data for {name} ({ticker}): {e}")
+    return {'Company Name': name, 'Ticker': ticker, 'error': str(e)}
+
+
+def fetch_company_frame(key: str, tickers: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """
+    Fetches every company of the region (or only those of `tickers` it lists)
+    concurrently through the shared fetch engine, then converts and classifies
+    them in one vectorized pass.
+    """
+    region = REGIONS[key]
+    universe = region.universe
+    companies = universe.companies()
+    if tickers is not None:
+        wanted = {ticker.upper() for ticker in tickers}
+        # "TCS" selects TCS.NS as well as "TCS.NS" itself
+        companies = [company for company in companies
+                     if company[1].upper() in wanted or company[1].upper().split('.', 1)[0] in wanted]
+    raw = pd.DataFrame(fetch_concurrently(companies, _fetch_company_info, _error_row),
+                       columns=None if companies else ['Company Name', 'Ticker'])
+    return classify_companies(universe.fill_listing_fields(raw), TIERS_USD_BILLION,
+                              default_currency=region.default_currency)
+
+
+def fetch_real_time_data(key: str, tickers: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Fetches real-time market cap data from Yahoo Finance and converts it to
+    USD, for the whole region or only the listed `tickers`. Market caps are
+    numbers, NaN where unavailable.
+    """
+    return fetch_company_frame(key, tickers).to_dict('records')
+
+
+def build_company_database(key: str) -> Dict[str, List[CompanyRecord]]:
+    """
+    Generates and returns a structured dictionary of company data for the
+    region, categorized by market cap. Raises IncompleteDatabaseError when
+    nothing loaded or more than MAX_FAILED_FRACTION of the fetches failed.
+    """
+    with timed(region_build_seconds, "region_build", region=key):
+        frame = fetch_company_frame(key)
+        database = group_by_tier(frame, TIERS_USD_BILLION)
+    failed = int((frame['Category'] == 'Error').sum()) if len(frame) else 0
+    if not any(database.values()) or failed > MAX_FAILED_FRACTION * len(frame):
+        raise IncompleteDatabaseError(f"{failed} of {len(frame)} companies failed to load for {key}", database)
+    return database
+
+
+def get_company_database(key: str) -> Dict[str, List[CompanyRecord]]:
+    """
+    Returns the region's company database from the shared cache. Expired data
+    is served while a background refresh runs; only a cold cache waits on
+    Yahoo Finance. A rebuild that fails too often never replaces cached data;
+    with nothing cached, whatever did load is returned uncached.
+    """
+    try:
+        return company_db_cache.get(key, lambda: build_company_database(key))
+    except IncompleteDatabaseError as e:
+        print(f"Error building company database: {e}")
+        return e.database
+
+
+def warm_company_database(key: str) -> None:
+    """
+    Starts building the region's company database in the background unless
+    it is already cached.
+    """
+    company_db_cache.warm(key, lambda: build_company_database(key))
+
+
+def resolve_symbol(key: str, ticker: str) -> str:
+    region = REGIONS[key]
+    symbol = ticker.upper()
+    if symbol in region.universe or not region.symbol_suffix or '.' in symbol:
+        return symbol
+    return symbol + region.symbol_suffix
+
+
+def get_stock_data(key: str, ticker: str, period: str = '1M') -> Optional[Dict[str, Any]]:
+    """
+    Fetches stock data for a ticker listed in the region, including historical
+    prices. marketCap is in the listing currency and marketCapUsd in USD.
+    """
+    region = REGIONS[key]
+    symbol = resolve_symbol(key, ticker)
+    provider = get_provider()
+
+    try:
+        info = provider.get_info(symbol)
+        if not info:
+            return None
+
+        history = ohlc_store.get_bars(symbol, period if period in PERIODS else '1M')
+        historical_prices = history['Close'].tolist()
+
+        current_price = info.get('regularMarketPrice') or info.get('currentPrice')
+        previous_close = info.get('previousClose')
+
+        if current_price is None or previous_close is None:
+            if historical_prices:
+                current_price = historical_prices[-1]
+                if len(historical_prices) > 1:
+                    previous_close = historical_prices[-2]
+                else:
+                    previous_close = current_price
+            else:
+                return None
+
+        change = current_price - previous_close
+        change_percent = (change / previous_close) * 100 if previous_close else 0
+
+        currency = info.get('currency', region.default_currency)
+        market_cap = info.get('marketCap')
+        market_cap_usd = fx_rates.convert(market_cap, currency) if market_cap else None
+
+        volume = info.get('regularMarketVolume') or info.get('volume')
+        high_52w = info.get('fiftyTwoWeekHigh')
+        low_52w = info.get('fiftyTwoWeekLow')
+
+        return {
+            'name': info.get('longName', ticker.upper()),
+            'price': current_price,
+            'change': change,
+            'changePercent': change_percent,
+            'currency': currency,
+            'marketCap': market_cap,
+            'marketCapUsd': market_cap_usd,
+            'volume': volume,
+            'high52w': high_52w,
+            'low52w': low_52w,
+            'history': historical_prices
+        }
+
+    except Exception as e:
+        print(f"Error fetching data for {ticker}: {e}")
+        return None
+
+
+def print_classification(key: str) -> None:
+    """
+    Prints the region's live classification table, for running a regional
+    module as a script.
+    """
+    region = REGIONS[key]
+    df = fetch_company_frame(key)
+    display = [format_usd(value, region.display_unit, missing='Data N/A') for value in df['Market Cap (USD)']]
+    df.insert(3, region.display_column, display)
+    df.loc[df['Category'] == 'Error', region.display_column] = 'Error'
+    df = df[['Company Name', 'Ticker', 'Native Currency', region.display_column, 'Category', 'Sector', 'Beta']]
+    unit_name, scale = ("Million", 1000) if region.display_unit == USD_PER_MILLION else ("Billion", 1)
+    large_cap = TIERS_USD_BILLION['Large Cap'] * scale
+    mid_cap = TIERS_USD_BILLION['Mid Cap'] * scale
+
+    print(f"Real-Time Market Capitalization Classification for {region.name} (Converted to USD):")
+    print("-" * 115)
+    print(df.to_markdown(index=False))
+    print("-" * 115)
+    print(f"Classification Tiers (in {unit_name}s USD):\nLarge Cap: > ${large_cap:,.1f} {unit_name}\nMid Cap: ${mid_cap:,.1f}-${large_cap:,.1f} {unit_name}\nSmall Cap: < ${mid_cap:,.1f} {unit_name}")
+    print("\n*Data fetched live via yfinance, converted to USD using the cached FX rate table.")
@@ -0,0 +1,256 @@
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+import region_engine
+from company_records import CompanyRecord
+from data_cache import company_db_cache
+
+
+# --- Configuration for the Stock Screener ---
+
+# Results per /api/screen page unless ?limit= asks for fewer or more
+SCREEN_LIMIT = int(os.getenv("FINVISER_SCREEN_LIMIT", "50"))
+
+# Upper bound on ?limit=
+MAX_SCREEN_LIMIT = int(os.getenv("FINVISER_MAX_SCREEN_LIMIT", "500"))
+
+# ?sort= values; the index keeps a precomputed order for each, both directions
+SORT_KEYS = ("market_cap", "change", "position_52w", "ticker", "name")
+
+# Suffixes accepted on ?min_cap= / ?max_cap=, e.g. 2B or 750M
+CAP_SUFFIXES = {'K': 1e3, 'M': 1e6, 'B': 1e9, 'T': 1e12}
+
+
+def _categorical(values: Iterable[str], count: int) -> Tuple[np.ndarray, Dict[str, int]]:
+    """
+    Dictionary-encodes a string column: (codes, {value: code}).
+    """
+    lookup: Dict[str, int] = {}
+    codes = np.fromiter((lookup.setdefault(v, len(lookup)) for v in values), dtype=np.int32, count=count)
+    return codes, lookup
+
+
+def _floats(values: Iterable[Optional[float]], count: int) -> np.ndarray:
+    return np.fromiter((np.nan if v is None else v for v in values), dtype=float, count=count)
+
+
+class ScreenerIndex:
+    """
+    Every cached regional universe as one set of columnar arrays, with the
+    sort orders computed up front. A screen is then a handful of vectorized
+    comparisons and one pass over a precomputed order, whatever the universe
+    size; nothing is fetched.
+    """
+
+    def __init__(self, databases: Dict[str, Dict[str, List[CompanyRecord]]]):
+        # Kept to tell whether the cache has since replaced any of them
+        self.databases = dict(databases)
+        records: List[CompanyRecord] = []
+        regions: List[str] = []
+        for key, database in self.databases.items():
+            for tier_records in database.values():
+                records.extend(tier_records)
+                regions.extend([key] * len(tier_records))
+        self.records = records
+        self.record_regions = regions
+        n = len(records)
+
+        self.region = _categorical(regions, n)
+        self.tier = _categorical((r.tier for r in records), n)
+        self.currency = _categorical(((r.currency or '').upper() for r in records), n)
+        self.sector = _categorical(((r.sector or '').lower() for r in records), n)
+
+        self.market_cap = _floats((r.market_cap_usd for r in records), n)
+        self.change = _floats((r.change_percent for r in records), n)
+        price = _floats((r.price for r in records), n)
+        low = _floats((r.low_52w for r in records), n)
+        high = _floats((r.high_52w for r in records), n)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # 0 at the 52-week low, 100 at the high
+            self.position_52w = np.clip(np.where(high > low, (price - low) / (high - low) * 100, np.nan), 0, 100)
+
+        sort_columns = {
+            "market_cap": self.market_cap,
+            "change": self.change,
+            "position_52w": self.position_52w,
+            "ticker": np.array([r.ticker.upper() for r in records], dtype=str),
+            "name": np.array([(r.name or '').lower() for r in records], dtype=str),
+        }
+        self._orders: Dict[Tuple[str, bool], np.ndarray] = {}
+        for key, values in sort_columns.items():
+            ascending = np.argsort(values, kind='stable')
+            self._orders[(key, False)] = ascending
+            if values.dtype.kind == 'f':
+                # Missing figures sort last in both directions
+                known = ~np.isnan(values[ascending])
+                self._orders[(key, True)] = np.concatenate([ascending[known][::-1], ascending[~known]])
+            else:
+                self._orders[(key, True)] = ascending[::-1]
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def built_from(self, databases: Dict[str, Dict[str, List[CompanyRecord]]]) -> bool:
+        return self.databases.keys() == databases.keys() and all(
+            self.databases[key] is database for key, database in databases.items()
+        )
+
+    def screen(self, regions: List[str], tiers: List[str], currencies: List[str], sectors: List[str],
+               ranges: Dict[str, Tuple[Optional[float], Optional[float]]], sort: str, descending: bool,
+               limit: int, offset: int) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Returns (number of matches, one page of matching rows in sort order).
+        Companies missing a figure never match a range on it.
+        """
+        mask = np.ones(len(self.records), dtype=bool)
+        for (codes, lookup), wanted in ((self.region, regions), (self.tier, tiers),
+                                        (self.currency, currencies), (self.sector, sectors)):
+            if wanted:
+                mask &= np.isin(codes, [lookup[value] for value in wanted if value in lookup])
+        for column, (low, high) in ranges.items():
+            values = getattr(self, column)
+            if low is not None:
+                mask &= values >= low
+            if high is not None:
+                mask &= values <= high
+
+        order = self._orders[(sort, descending)]
+        matches = order[mask[order]]
+        return len(matches), [self._row(i) for i in matches[offset:offset + limit].tolist()]
+
+    def _row(self, i: int) -> Dict[str, Any]:
+        row = self.records[i].as_dict()
+        row['region'] = self.record_regions[i]
+        position = self.position_52w[i]
+        row['position_52w'] = None if np.isnan(position) else float(position)
+        return row
+
+
+_index_lock = threading.Lock()
+_index: Optional[ScreenerIndex] = None
+
+
+def current_index(regions: Iterable[str]) -> Tuple[ScreenerIndex, List[str]]:
+    """
+    Returns the index over every cached regional database, rebuilt only after
+    the cache has replaced one of them, and which of `regions` are not cached
+    yet. Those start loading in the background; the screen never waits on
+    Yahoo Finance.
+    """
+    global _index
+    databases = {}
+    for key in region_engine.REGIONS:
+        database = company_db_cache.peek(key)
+        if database is not None:
+            databases[key] = database
+    pending = [key for key in regions if key not in databases]
+    for key in pending:
+        region_engine.warm_company_database(key)
+    with _index_lock:
+        if _index is None or not _index.built_from(databases):
+            _index = ScreenerIndex(databases)
+        return _index, pending
+
+
+def _split(args, name: str) -> List[str]:
+    raw = ','.join(args.getlist(name))
+    return list(dict.fromkeys(v.strip() for v in raw.split(',') if v.strip()))
+
+
+def _number(args, name: str) -> Optional[float]:
+    value = args.get(name)
+    if value is None or value.strip() == '':
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f'{name} must be a number.') from None
+
+
+def _usd(args, name: str) -> Optional[float]:
+    value = (args.get(name) or '').strip().upper().lstrip('$')
+    if not value:
+        return None
+    unit = CAP_SUFFIXES.get(value[-1])
+    try:
+        return float(value[:-1] if unit else value) * (unit or 1)
+    except ValueError:
+        raise ValueError(f'{name} must be a dollar amount, e.g. 2B or 750M.') from None
+
+
+def _tier(value: str) -> str:
+    # "large", "Large Cap" and "large_cap" all name the "Large Cap" tier
+    wanted = value.replace('_', ' ').split()[0].lower()
+    for tier in region_engine.TIERS_USD_BILLION:
+        if tier.split()[0].lower() == wanted:
+            return tier
+    raise ValueError(f"Unknown tier. Use one of: {', '.join(region_engine.TIERS_USD_BILLION)}.")
+
+
+def parse_screen_options(args) -> Dict[str, Any]:
+    """
+    Reads the /api/screen query parameters: region, tier, currency and
+    sector (comma-separated, repeatable), min_cap / max_cap in USD,
+    min_change / max_change in percent, min_52w / max_52w (0 at the 52-week
+    low, 100 at the high), sort, order, limit and offset. Raises ValueError
+    with a user-facing message.
+    """
+    regions = []
+    for name in _split(args, 'region'):
+        region = region_engine.get_region(name)
+        if region is None:
+            raise ValueError(f"Unknown region. Use one of: {', '.join(region_engine.REGIONS)}.")
+        regions.append(region.key)
+
+    ranges = {
+        'market_cap': (_usd(args, 'min_cap'), _usd(args, 'max_cap')),
+        'change': (_number(args, 'min_change'), _number(args, 'max_change')),
+        'position_52w': (_number(args, 'min_52w'), _number(args, 'max_52w')),
+    }
+
+    sort = args.get('sort', 'market_cap').lower()
+    if sort not in SORT_KEYS:
+        raise ValueError(f"Unknown sort. Use one of: {', '.join(SORT_KEYS)}.")
+    order = args.get('order', 'asc' if sort in ('ticker', 'name') else 'desc').lower()
+    if order not in ('asc', 'desc'):
+        raise ValueError('order must be asc or desc.')
+    try:
+        limit = int(args.get('limit', SCREEN_LIMIT))
+        offset = int(args.get('offset', 0))
+    except ValueError:
+        raise ValueError('limit and offset must be whole numbers.') from None
+    if not 1 <= limit <= MAX_SCREEN_LIMIT:
+        raise ValueError(f'limit must be between 1 and {MAX_SCREEN_LIMIT}.')
+    if offset < 0:
+        raise ValueError('offset must not be negative.')
+
+    return {
+        'regions': list(dict.fromkeys(regions)),
+        'tiers': list(dict.fromkeys(_tier(t) for t in _split(args, 'tier'))),
+        'currencies': [c.upper() for c in _split(args, 'currency')],
+        'sectors': [s.lower() for s in _split(args, 'sector')],
+        'ranges': {column: bounds for column, bounds in ranges.items() if bounds != (None, None)},
+        'sort': sort,
+        'descending': order == 'desc',
+        'limit': limit,
+        'offset': offset,
+    }
+
+
+def screen(options: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Runs parse_screen_options output against the cached universes.
+    """
+    index, pending = current_index(options['regions'] or region_engine.REGIONS)
+    total, results = index.screen(**options)
+    return {
+        'total': total,
+        'offset': options['offset'],
+        'count': len(results),
+        'results': results,
+        # Regions whose data is still loading and so not screened yet
+        'pending_regions': pending,
+    }
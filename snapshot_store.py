@@ -0,0 +1,96 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+
+from company_records import CompanyRecord, database_as_dicts, database_from_dicts
+from data_cache import company_db_cache
+
+
+# --- Configuration for Market Data Snapshots ---
+
+# Set to "0" to start every worker with empty caches
+SNAPSHOTS_ENABLED = os.getenv("FINVISER_SNAPSHOTS", "1") == "1"
+
+# SQLite file holding the last regional company databases. Price histories
+# persist separately, in ohlc_store's database.
+SNAPSHOT_PATH = os.getenv(
+    "FINVISER_SNAPSHOT_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "instance", "market_snapshot.sqlite3"),
+)
+
+
+class SnapshotStore:
+    """
+    On-disk copy of the regional company databases, so a freshly started
+    worker can serve warm data immediately and revalidate it in the
+    background.
+    """
+
+    def __init__(self, path: str = SNAPSHOT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS company_databases ("
+                " region TEXT PRIMARY KEY, payload TEXT NOT NULL, saved_at REAL NOT NULL)"
+            )
+            # Left behind by older versions, which also snapshotted histories
+            conn.execute("DROP TABLE IF EXISTS price_histories")
+
+    def save_company_database(self, region: str, database: Dict[str, List[CompanyRecord]]) -> None:
+        if not any(database.values()):
+            return  # never replace a good snapshot with a failed fetch
+        self._write(
+            "INSERT OR REPLACE INTO company_databases (region, payload, saved_at) VALUES (?, ?, ?)",
+            (region, json.dumps(database_as_dicts(database)), time.time()),
+        )
+
+    def load_company_databases(self) -> Dict[str, Tuple[Dict[str, List[CompanyRecord]], float]]:
+        """
+        Returns {region: (database, saved_at)}. Snapshots from before market
+        caps were stored as numbers are skipped and rebuilt on first use.
+        """
+        with self._connect() as conn:
+            rows = conn.execute("SELECT region, payload, saved_at FROM company_databases").fetchall()
+        databases = {}
+        for region, payload, saved_at in rows:
+            data = json.loads(payload)
+            if all('tier' in company for companies in data.values() for company in companies):
+                databases[region] = (database_from_dicts(data), saved_at)
+        return databases
+
+    def _write(self, sql: str, params: tuple) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute(sql, params)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+
+def install(store: SnapshotStore) -> None:
+    """
+    Primes the company database cache from the snapshot, then keeps the
+    snapshot up to date with every refresh. Primed entries keep their
+    original age, so anything older than the cache TTL is served once and
+    revalidated.
+    """
+    now = time.time()
+    try:
+        for region, (database, saved_at) in store.load_company_databases().items():
+            company_db_cache.prime(region, database, age=now - saved_at)
+    except (sqlite3.Error, ValueError) as e:
+        print(f"Error loading market data snapshot: {e}")
+
+    company_db_cache.on_update = store.save_company_database
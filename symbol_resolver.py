@@ -0,0 +1,250 @@
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Tuple
+
+from market_provider import MarketDataNotFound
+from quote_cache import quote_cache
+
+
+# --- Configuration for Ticker Resolution ---
+
+# JSON file remembering which exchange-qualified symbol answered for each bare ticker
+SYMBOL_CACHE_PATH = os.getenv(
+    "FINVISER_SYMBOL_CACHE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "instance", "symbol_cache.json"),
+)
+
+# Seconds a ticker that resolved nowhere is remembered as unknown
+NEGATIVE_TTL = float(os.getenv("FINVISER_SYMBOL_NEGATIVE_TTL", "600"))
+
+# Unknown tickers remembered at once; the oldest are forgotten first
+MAX_UNKNOWN = int(os.getenv("FINVISER_SYMBOL_NEGATIVE_CAPACITY", "5000"))
+
+# Other exchanges carrying the same listing, tried when the mapped one fails
+SUFFIX_FALLBACKS = {
+    '.NS': ['.BO'],   # NSE -> BSE
+    '.BO': ['.NS'],   # BSE -> NSE
+}
+
+# Exchanges raced for a ticker that is in no regional universe, as a comma
+# separated list ("" disables the fan-out). The bare symbol (US listing) is
+# always tried first, so only a US miss pays for this stage: one upstream
+# lookup per suffix, after which the negative cache answers for NEGATIVE_TTL.
+UNLISTED_SUFFIXES = [
+    suffix.strip().upper()
+    for suffix in os.getenv("FINVISER_UNLISTED_SUFFIXES", ".NS,.BO,.PA,.DE,.SW,.BR,.AS,.L").split(",")
+    if suffix.strip()
+]
+
+# Anything else cannot be a Yahoo symbol and is rejected without a lookup.
+# A leading ^ marks an index, e.g. ^GSPC or ^NSEI.
+_PLAUSIBLE_SYMBOL = re.compile(r'^\^?[A-Z0-9][A-Z0-9&\-]{0,14}(\.[A-Z]{1,3})?$')
+
+
+class SymbolLookupUnavailable(RuntimeError):
+    """
+    No candidate had a quote and at least one lookup failed, so whether the
+    ticker exists is not known. Unlike LookupError, nothing is cached.
+    """
+
+
+def bare_symbol(symbol: str) -> str:
+    return symbol.upper().split('.', 1)[0]
+
+
+def _suffix(symbol: str) -> str:
+    return symbol[symbol.index('.'):] if '.' in symbol else ''
+
+
+def _is_quote(info: Dict[str, Any]) -> bool:
+    return bool(info) and any(
+        info.get(field) is not None
+        for field in ('regularMarketPrice', 'currentPrice', 'regularMarketPreviousClose', 'previousClose')
+    )
+
+
+class SymbolResolver:
+    """
+    Maps a bare ticker such as "TCS" to the exchange-qualified symbol Yahoo
+    knows it by ("TCS.NS"), using every regional universe plus a suffix
+    ruleset, and remembers the winning symbol on disk.
+    """
+
+    def __init__(self, cache_path: str = SYMBOL_CACHE_PATH):
+        self.cache_path = cache_path
+        self._lock = threading.Lock()
+        self._resolved: Dict[str, str] = self._load()
+        self._unknown: Dict[str, float] = {}
+        self._listings: Optional[Dict[str, List[str]]] = None
+
+    def candidate_stages(self, ticker: str) -> List[List[str]]:
+        """
+        Returns exchange-qualified symbols to try for ticker, as successive
+        stages raced concurrently, best first within each stage.
+        """
+        ticker = ticker.upper()
+        if '.' in ticker:
+            symbols = [ticker]
+        else:
+            symbols = list(self._company_listings().get(ticker, []))
+            if not symbols:
+                # Unlisted: a bare (US) hit is by far the most common, so only
+                # fan out to the other exchanges when it misses. Indices
+                # (^GSPC) carry no exchange suffix.
+                if ticker.startswith('^') or not UNLISTED_SUFFIXES:
+                    return [[ticker]]
+                return [[ticker], [ticker + suffix for suffix in UNLISTED_SUFFIXES]]
+
+        for symbol in list(symbols):
+            for suffix in SUFFIX_FALLBACKS.get(_suffix(symbol), []):
+                fallback = bare_symbol(symbol) + suffix
+                if fallback not in symbols:
+                    symbols.append(fallback)
+        return [symbols]
+
+    def resolve(self, ticker: str) -> Tuple[str, Dict[str, Any]]:
+        """
+        Returns (symbol, info) for ticker. Raises LookupError when every
+        exchange answered without a quote for it, and SymbolLookupUnavailable
+        when none had a quote but some could not be asked.
+        """
+        ticker = ticker.upper()
+        if not _PLAUSIBLE_SYMBOL.match(ticker):
+            raise LookupError(f"{ticker} is not a valid ticker")
+        with self._lock:
+            cached = self._resolved.get(ticker)
+            unknown_since = self._unknown.get(ticker)
+        if unknown_since is not None and time.monotonic() - unknown_since < NEGATIVE_TTL:
+            raise LookupError(f"No exchange lists {ticker}")
+
+        failed = False
+        if cached:
+            try:
+                info = quote_cache.get_info(cached)
+                if _is_quote(info):
+                    return cached, info
+            except MarketDataNotFound:
+                pass
+            except Exception as e:
+                print(f"Cached symbol {cached} for {ticker} failed: {e}")
+                failed = True
+
+        result = None
+        for i, stage in enumerate(self.candidate_stages(ticker)):
+            candidates = [c for c in stage if c != cached]
+            if failed and i == 0:
+                # Still the best guess; it may only have failed transiently
+                candidates.insert(0, cached)
+            result, stage_failed = self._race(candidates)
+            failed = failed or stage_failed
+            if result is not None:
+                break
+
+        if result is None:
+            if failed:
+                # An outage is not evidence the ticker is unlisted: keep the
+                # mapping and let the next request try again
+                raise SymbolLookupUnavailable(f"Could not look up {ticker}")
+            with self._lock:
+                self._remember_unknown(ticker)
+                changed = self._resolved.pop(ticker, None) is not None
+                if changed:
+                    self._save()
+            raise LookupError(f"No exchange lists {ticker}")
+
+        with self._lock:
+            self._unknown.pop(ticker, None)
+            if self._resolved.get(ticker) != result[0]:
+                self._resolved[ticker] = result[0]
+                self._save()
+        return result
+
+    def _remember_unknown(self, ticker: str) -> None:
+        """
+        Records ticker as unknown, first dropping expired entries and then,
+        if still full, the oldest ones. Call with the lock held.
+        """
+        now = time.monotonic()
+        self._unknown.pop(ticker, None)
+        if len(self._unknown) >= MAX_UNKNOWN:
+            for key, since in list(self._unknown.items()):
+                if now - since >= NEGATIVE_TTL:
+                    del self._unknown[key]
+            # Insertion order is age order
+            while self._unknown and len(self._unknown) >= MAX_UNKNOWN:
+                del self._unknown[next(iter(self._unknown))]
+        if MAX_UNKNOWN > 0:
+            self._unknown[ticker] = now
+
+    def _race(self, candidates: List[str]) -> Tuple[Optional[Tuple[str, Dict[str, Any]]], bool]:
+        """
+        Queries every candidate concurrently and returns the highest-priority
+        one with a quote, without waiting for lower-priority stragglers, and
+        whether any lookup raised.
+        """
+        if not candidates:
+            return None, False
+
+        outcomes: Dict[str, Optional[Dict[str, Any]]] = {}
+        failed = False
+        executor = ThreadPoolExecutor(max_workers=len(candidates), thread_name_prefix="finviser-resolve")
+        try:
+            futures = {executor.submit(quote_cache.get_info, symbol): symbol for symbol in candidates}
+            for future in as_completed(futures):
+                symbol = futures[future]
+                try:
+                    info = future.result()
+                    outcomes[symbol] = info if _is_quote(info) else None
+                except MarketDataNotFound:
+                    outcomes[symbol] = None  # an answer, just not a listing
+                except Exception as e:
+                    print(f"Lookup of {symbol} failed: {e}")
+                    outcomes[symbol] = None
+                    failed = True
+
+                for candidate in candidates:
+                    if candidate not in outcomes:
+                        break  # a better candidate is still in flight
+                    if outcomes[candidate] is not None:
+                        return (candidate, outcomes[candidate]), failed
+            return None, failed
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _company_listings(self) -> Dict[str, List[str]]:
+        if self._listings is None:
+            import region_engine
+
+            listings: Dict[str, List[str]] = {}
+            for region in region_engine.REGIONS.values():
+                for symbol in region.company_map().values():
+                    symbol = symbol.upper()
+                    for key in {symbol, bare_symbol(symbol)}:
+                        if symbol not in listings.setdefault(key, []):
+                            listings[key].append(symbol)
+            self._listings = listings
+        return self._listings
+
+    def _load(self) -> Dict[str, str]:
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = self.cache_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._resolved, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"Error saving symbol cache: {e}")
+
+
+symbol_resolver = SymbolResolver()
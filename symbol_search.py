@@ -0,0 +1,139 @@
+import os
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+import region_engine
+
+
+# --- Configuration for Ticker Search ---
+
+# Suggestions per /api/search response unless ?limit= asks for fewer or more
+SEARCH_LIMIT = int(os.getenv("FINVISER_SEARCH_LIMIT", "10"))
+
+# Upper bound on ?limit=
+MAX_SEARCH_LIMIT = 50
+
+_NON_ALNUM = re.compile(r'[^0-9a-z]+')
+
+# Sorts after every character a normalized key can hold, so
+# [bisect(q), bisect(q + _PREFIX_END)) is every key starting with q
+_PREFIX_END = '\uffff'
+
+
+def fold(text: str) -> str:
+    """
+    Case- and accent-insensitive form of text: "Moët" and "MOET" both give "moet".
+    """
+    if text.isascii():
+        return text.casefold().strip()
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).casefold().strip()
+
+
+def name_key(text: str) -> str:
+    """
+    A name reduced to lowercase ASCII-ish words separated by single spaces,
+    e.g. "LVMH Moët Hennessy - Louis Vuitton SE" -> "lvmh moet hennessy louis vuitton se".
+    """
+    return _NON_ALNUM.sub(' ', fold(text)).strip()
+
+
+class _SortedKeys:
+    """
+    Sorted keys with the entry each belongs to; a prefix lookup is two binary searches.
+    """
+
+    def __init__(self, pairs: List[Tuple[str, int]]):
+        pairs.sort()
+        self.keys = [key for key, _ in pairs]
+        self.entries = [entry for _, entry in pairs]
+
+    def prefix_range(self, prefix: str) -> Tuple[int, int]:
+        return bisect_left(self.keys, prefix), bisect_left(self.keys, prefix + _PREFIX_END)
+
+
+class SymbolSearchIndex:
+    """
+    Typeahead over the tickers and company names of every region's universe.
+
+    Names are indexed from the start of every word, so "moet", "hennessy
+    louis" and "lvmh" all find LVMH. A keystroke costs a few binary searches
+    plus reading at most `limit` entries per match kind, however many
+    symbols are listed.
+    """
+
+    def __init__(self, listings: List[Dict[str, str]]):
+        self.listings = listings
+        tickers, names, words = [], [], []
+        for entry, listing in enumerate(listings):
+            tickers.append((fold(listing['ticker']), entry))
+            name = name_key(listing['name'])
+            if name:
+                names.append((name, entry))
+            words.extend((name[m.end():], entry) for m in re.finditer(' ', name))
+        self._tickers = _SortedKeys(tickers)
+        self._names = _SortedKeys(names)
+        self._words = _SortedKeys(words)
+
+    def __len__(self) -> int:
+        return len(self.listings)
+
+    def search(self, query: str, limit: int = SEARCH_LIMIT) -> List[Dict[str, str]]:
+        ticker_query = fold(query)
+        text_query = name_key(query)
+        if not ticker_query:
+            return []
+
+        found: List[int] = []
+        seen = set()
+
+        def take(keys: _SortedKeys, prefix: str, exact: bool = False) -> None:
+            if not prefix:
+                return
+            lo, hi = keys.prefix_range(prefix)
+            for i in range(lo, hi):
+                if len(found) >= limit:
+                    return
+                if exact and keys.keys[i] != prefix:
+                    return
+                entry = keys.entries[i]
+                if entry not in seen:
+                    seen.add(entry)
+                    found.append(entry)
+
+        # Ranked: the ticker itself, tickers starting with the query, names
+        # starting with it, then later words of names starting with it
+        take(self._tickers, ticker_query, exact=True)
+        take(self._tickers, ticker_query)
+        take(self._names, text_query)
+        take(self._words, text_query)
+        return [self.listings[entry] for entry in found]
+
+
+_index_lock = threading.Lock()
+_index: Optional[SymbolSearchIndex] = None
+
+
+def get_search_index() -> SymbolSearchIndex:
+    """
+    Returns the search index, building it from the universe files on first use.
+    """
+    global _index
+    with _index_lock:
+        if _index is None:
+            listings = []
+            for region in region_engine.REGIONS.values():
+                frame = region.universe.frame
+                for ticker, name, exchange, currency in zip(frame['ticker'], frame['name'],
+                                                            frame['exchange'], frame['currency']):
+                    listings.append({'ticker': ticker, 'name': name, 'region': region.key,
+                                     'exchange': exchange, 'currency': currency})
+            _index = SymbolSearchIndex(listings)
+        return _index
+
+
+def search(query: str, limit: int = SEARCH_LIMIT) -> List[Dict[str, str]]:
+    return get_search_index().search(query, limit)
@@ -0,0 +1,205 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+import app as flask_module
+import asgi
+import finviserAI
+import fx_rates
+import market_provider
+from data_cache import company_db_cache
+from ohlc_store import ohlc_store
+from quote_cache import quote_cache
+from quote_stream import STREAM_RETRY_MS, quote_hub
+from symbol_resolver import symbol_resolver
+
+# Every test gives up after this many seconds instead of hanging the run
+TIMEOUT = 10
+
+PREFERENCES = {"region": "USA", "risk_appetite": "High", "investment_horizon": "Long-term",
+               "preferred_sectors": "Technology", "salary": "100k", "loan": "0", "monthly_expense": "2,000"}
+
+
+class StubModel:
+    """
+    Stands in for the Gemini model; hangs instead of answering when `hang` is set.
+    """
+
+    def __init__(self):
+        self.prompts = []
+        self.hang = False
+
+    async def generate_content_async(self, prompt):
+        self.prompts.append(prompt)
+        if self.hang:
+            await asyncio.Event().wait()
+        return type("StubResponse", (), {"text": "### Recommendations\n- AAPL"})()
+
+
+@pytest.fixture
+def model(monkeypatch, tmp_path):
+    # Recorded market data only, and nothing written outside tmp_path
+    previous = market_provider.get_provider()
+    market_provider.set_provider(market_provider.ReplayProvider())
+    monkeypatch.setattr(fx_rates.fx_service, "source", fx_rates.StaticFxSource())
+    monkeypatch.setattr(symbol_resolver, "cache_path", str(tmp_path / "symbol_cache.json"))
+    monkeypatch.setattr(symbol_resolver, "_resolved", {})
+    monkeypatch.setattr(symbol_resolver, "_unknown", {})
+    monkeypatch.setattr(ohlc_store, "path", "")
+    monkeypatch.setattr(flask_module, "_background_started", True)
+    for cache in (company_db_cache, quote_cache, ohlc_store):
+        cache.invalidate()
+
+    stub = StubModel()
+    monkeypatch.setattr(finviserAI, "RECOMMENDER", "gemini")
+    monkeypatch.setattr(finviserAI, "_model", stub)
+    monkeypatch.setattr(finviserAI, "GEMINI_TIMEOUT", 0.5)
+    monkeypatch.setattr(finviserAI, "recommendation_cache", finviserAI.RecommendationCache())
+    yield stub
+    market_provider.set_provider(previous)
+
+
+def call(method, path, **kwargs):
+    async def send():
+        transport = httpx.ASGITransport(app=asgi.application)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            return await client.request(method, path, **kwargs)
+    return asyncio.run(asyncio.wait_for(send(), TIMEOUT))
+
+
+# --- /api/stock and /api/stocks ---
+
+def test_stock_resolves_bare_ticker(model):
+    response = call("GET", "/api/stock/TCS?period=1Y&points=50")
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["currency"] == "INR"
+    assert data["bars"] > 200
+    assert len(data["history"]) == len(data["timestamps"]) <= 50
+
+
+@pytest.mark.parametrize("points", [3, 200])
+def test_stock_without_bars_honours_the_point_cap(model, points):
+    class NoBars(market_provider.ReplayProvider):
+        def get_history_since(self, symbol, start, interval="1d"):
+            return super().get_history_since(symbol, start, interval).iloc[:0]
+
+    market_provider.set_provider(NoBars())
+    data = call("GET", f"/api/stock/AAPL?points={points}").json()["data"]
+    assert data["bars"] == 0
+    assert len(data["history"]) == len(data["timestamps"]) == min(points, flask_module.FALLBACK_CHART_POINTS)
+
+
+def test_stock_unknown_ticker_is_404(model):
+    response = call("GET", "/api/stock/NOPE")
+    assert response.status_code == 404
+    assert response.json() == {"success": False, "message": "Stock data not found."}
+
+
+def test_stock_bad_option_is_400(model):
+    response = call("GET", "/api/stock/AAPL?period=2D")
+    assert response.status_code == 400
+    assert response.json()["success"] is False
+
+
+def test_stock_outage_is_503(model):
+    class Down(market_provider.ReplayProvider):
+        def get_info(self, symbol):
+            raise ConnectionError("upstream down")
+
+    market_provider.set_provider(Down())
+    response = call("GET", "/api/stock/AAPL")
+    assert response.status_code == 503
+    assert "temporarily unavailable" in response.json()["message"]
+
+
+def test_history_outage_is_503_not_404(model):
+    class HistoryDown(market_provider.ReplayProvider):
+        def get_history_since(self, symbol, start, interval="1d"):
+            raise ConnectionError("upstream down")
+
+    market_provider.set_provider(HistoryDown())
+    response = call("GET", "/api/stock/AAPL")
+    assert response.status_code == 503
+    assert "temporarily unavailable" in response.json()["message"]
+
+
+def test_bulk_stocks_report_failures_per_ticker(model):
+    response = call("GET", "/api/stocks?tickers=AAPL,NOPE&points=10")
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["AAPL"]["success"] is True
+    assert data["NOPE"] == {"success": False, "message": "Stock data not found."}
+
+
+def test_bulk_stocks_need_tickers(model):
+    response = call("GET", "/api/stocks")
+    assert response.status_code == 400
+    assert response.json() == {"success": False, "message": "No tickers provided."}
+
+
+# --- /api/ai_recommendations ---
+
+def test_recommendations_come_from_the_model(model):
+    response = call("POST", "/api/ai_recommendations", content=json.dumps(PREFERENCES))
+    assert response.status_code == 200
+    assert response.json() == {"success": True, "recommendations": "### Recommendations\n- AAPL"}
+    assert "AAPL" in model.prompts[0]
+
+
+@pytest.mark.parametrize("body", ["{not json", "[1, 2]", '"USA"', "null"])
+def test_recommendations_reject_bodies_that_are_not_objects(model, body):
+    response = call("POST", "/api/ai_recommendations", content=body)
+    assert response.status_code == 400
+    assert response.json() == {"success": False, "message": "Invalid JSON body."}
+
+
+def test_recommendations_reject_unknown_region(model):
+    response = call("POST", "/api/ai_recommendations", content=json.dumps({"region": "MARS"}))
+    assert response.status_code == 400
+    assert response.json()["success"] is False
+
+
+def test_hung_model_falls_back_to_local_recommendations(model):
+    model.hang = True
+    response = call("POST", "/api/ai_recommendations", content=json.dumps(PREFERENCES))
+    assert response.status_code == 200
+    assert response.json()["success"] is True
+    assert response.json()["recommendations"]
+
+
+# --- /api/quotes/stream ---
+
+def test_quote_stream_stops_when_the_client_disconnects(model):
+    async def scenario():
+        started = asyncio.Event()
+        leave = asyncio.Event()
+        messages = []
+
+        async def receive():
+            if not leave.is_set():
+                await leave.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            messages.append(message)
+            if message["type"] == "http.response.start":
+                started.set()
+
+        scope = {"type": "http", "method": "GET", "path": "/api/quotes/stream",
+                 "query_string": b"tickers=AAPL", "headers": []}
+        task = asyncio.create_task(asgi.application(scope, receive, send))
+        await asyncio.wait_for(started.wait(), TIMEOUT)
+        assert quote_hub.stats()["subscriptions"] == 1
+
+        leave.set()
+        # Well before the next heartbeat
+        await asyncio.wait_for(task, 2)
+        return messages
+
+    messages = asyncio.run(scenario())
+    assert messages[0]["status"] == 200
+    assert messages[1]["body"] == f"retry: {STREAM_RETRY_MS}\n\n".encode()
+    assert quote_hub.stats()["subscriptions"] == 0
@@ -0,0 +1,87 @@
+import base64
+
+import numpy as np
+import pytest
+
+from chart_series import downsample, encode
+
+
+def series(n=1000, seed=7):
+    rng = np.random.default_rng(seed)
+    x = np.arange(n, dtype=np.int64) * 86_400_000 + 1_700_000_000_000
+    y = 100 + np.cumsum(rng.normal(0, 1, n))
+    return x, y
+
+
+# --- downsample ---
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+@pytest.mark.parametrize("points", [2, 3, 4, 10, 101, 500, 999])
+def test_downsample_caps_points_and_keeps_endpoints(method, points):
+    x, y = series()
+    dx, dy = downsample(x, y, points, method)
+    assert len(dx) == len(dy) <= points
+    assert (dx[0], dy[0]) == (x[0], y[0])
+    assert (dx[-1], dy[-1]) == (x[-1], y[-1])
+    assert np.all(np.diff(dx) > 0)
+    # Every kept point is a point of the input
+    positions = np.searchsorted(x, dx)
+    assert np.array_equal(y[positions], dy)
+
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+@pytest.mark.parametrize("points", [50, 51, 500, 0])
+def test_short_series_are_returned_unchanged(method, points):
+    x, y = series(50)
+    dx, dy = downsample(x, y, points, method)
+    assert np.array_equal(dx, x)
+    assert np.array_equal(dy, y)
+
+
+def test_minmax_keeps_the_extremes():
+    x, y = series()
+    y[123] = 10_000.0
+    y[777] = -10_000.0
+    _, dy = downsample(x, y, 20, "minmax")
+    assert dy.max() == 10_000.0
+    assert dy.min() == -10_000.0
+
+
+def test_lttb_keeps_a_lone_spike():
+    x = np.arange(1000)
+    y = np.zeros(1000)
+    y[500] = 50.0
+    dx, dy = downsample(x, y, 20, "lttb")
+    assert 500 in dx and dy.max() == 50.0
+
+
+def test_unknown_method_is_rejected():
+    x, y = series(10)
+    with pytest.raises(ValueError):
+        downsample(x, y, 5, "average")
+
+
+# --- encode ---
+
+def test_json_encoding_is_plain_lists():
+    timestamps, values = encode([1, 2], [1.5, 2.5])
+    assert timestamps == [1, 2] and values == [1.5, 2.5]
+
+
+def test_binary_encoding_round_trips():
+    x, y = series(100)
+    timestamps, values = encode(x, y, "binary")
+    decoded_x = np.frombuffer(base64.b64decode(timestamps), dtype="<i8")
+    decoded_y = np.frombuffer(base64.b64decode(values), dtype="<f4")
+    assert np.array_equal(decoded_x, x)
+    assert np.allclose(decoded_y, y.astype(np.float32))
+    assert len(decoded_x) == len(decoded_y) == 100
+
+
+def test_binary_encoding_of_nothing_is_empty():
+    assert encode([], [], "binary") == ("", "")
+
+
+def test_unknown_encoding_is_rejected():
+    with pytest.raises(ValueError):
+        encode([1], [1.0], "msgpack")
@@ -0,0 +1,109 @@
+import time
+
+import pytest
+
+import market_provider
+import region_engine
+from data_cache import StaleWhileRevalidateCache, company_db_cache
+
+
+class FlakyProvider(market_provider.MarketDataProvider):
+    """
+    Answers quotes for every symbol except those in `failing` (all of them
+    when failing is True), which raise as during an outage.
+    """
+
+    name = "flaky"
+
+    def __init__(self):
+        self.failing = set()
+
+    def get_info(self, symbol):
+        if self.failing is True or symbol in self.failing:
+            raise ConnectionError("upstream down")
+        return {"marketCap": 50e9, "currency": "USD", "regularMarketPrice": 10.0,
+                "regularMarketPreviousClose": 9.0}
+
+    def get_history(self, symbol, period="1mo", interval="1d"):
+        raise NotImplementedError
+
+    def get_history_since(self, symbol, start, interval="1d"):
+        raise NotImplementedError
+
+
+@pytest.fixture
+def provider():
+    fake = FlakyProvider()
+    previous = market_provider.get_provider()
+    market_provider.set_provider(fake)
+    company_db_cache.invalidate()
+    yield fake
+    company_db_cache.invalidate()
+    market_provider.set_provider(previous)
+
+
+def sizes(database):
+    return {tier: len(records) for tier, records in database.items()}
+
+
+def expire_and_revalidate(key):
+    company_db_cache._entries[key] = (company_db_cache._entries[key][0], time.monotonic() - company_db_cache.ttl - 1)
+    stale = region_engine.get_company_database(key)
+    deadline = time.monotonic() + 10
+    while company_db_cache._flight.in_flight(key) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return stale
+
+
+def test_outage_during_revalidation_keeps_the_last_good_database(provider):
+    good = region_engine.get_company_database("USA")
+    assert sizes(good)["Large Cap"] == len(region_engine.REGIONS["USA"].universe.companies())
+
+    provider.failing = True
+    errors = company_db_cache.stats()["load_errors"]
+    assert expire_and_revalidate("USA") is good
+    assert company_db_cache.peek("USA") is good
+    assert company_db_cache.stats()["load_errors"] == errors + 1
+
+
+def test_mostly_failed_rebuild_does_not_drop_companies(provider):
+    good = region_engine.get_company_database("USA")
+    tickers = [ticker for _, ticker in region_engine.REGIONS["USA"].universe.companies()]
+    provider.failing = set(tickers[:len(tickers) // 2 + 1])
+
+    expire_and_revalidate("USA")
+    assert company_db_cache.peek("USA") is good
+
+
+def test_a_few_failures_still_refresh(provider):
+    good = region_engine.get_company_database("USA")
+    tickers = [ticker for _, ticker in region_engine.REGIONS["USA"].universe.companies()]
+    provider.failing = {tickers[0]}
+
+    expire_and_revalidate("USA")
+    refreshed = company_db_cache.peek("USA")
+    assert refreshed is not good
+    assert sizes(refreshed)["Large Cap"] == len(tickers) - 1
+
+
+def test_cold_outage_returns_what_loaded_without_caching_it(provider):
+    provider.failing = True
+    assert sizes(region_engine.get_company_database("USA")) == {"Large Cap": 0, "Mid Cap": 0, "Small Cap": 0}
+    assert company_db_cache.peek("USA") is None
+
+    provider.failing = set()
+    assert sizes(region_engine.get_company_database("USA"))["Large Cap"] > 0
+
+
+def test_failed_load_leaves_the_stale_value_in_place():
+    cache = StaleWhileRevalidateCache(ttl=0)
+    cache.put("key", "old")
+
+    def failing():
+        raise RuntimeError("rejected")
+
+    with pytest.raises(RuntimeError):
+        cache._load("key", failing)
+    assert cache.peek("key") == "old"
+    assert cache.stats()["load_errors"] == 1
+    assert "rejected" in cache.stats()["last_error"]
@@ -0,0 +1,56 @@
+import threading
+import time
+
+from fetch_engine import fetch_concurrently
+
+
+def fetch_after(delays, release):
+    """
+    fetch_one sleeping delays[item] seconds; None blocks until release is set.
+    """
+    def fetch_one(item):
+        delay = delays[item]
+        if delay is None:
+            release.wait(10)
+        else:
+            time.sleep(delay)
+        return item.upper()
+    return fetch_one
+
+
+def on_error(item, exc):
+    return f"{item}: {type(exc).__name__}"
+
+
+def test_results_keep_input_order():
+    release = threading.Event()
+    delays = {"a": 0.05, "b": 0.0, "c": 0.02}
+    assert fetch_concurrently(list(delays), fetch_after(delays, release), on_error) == ["A", "B", "C"]
+
+
+def test_a_hung_item_times_out_alone():
+    release = threading.Event()
+    delays = {"a": 0.0, "hung": None, "b": 0.01, "c": 0.0, "d": 0.02}
+    started = time.monotonic()
+    try:
+        results = fetch_concurrently(list(delays), fetch_after(delays, release), on_error,
+                                     max_workers=2, timeout=0.3)
+    finally:
+        release.set()
+    elapsed = time.monotonic() - started
+
+    assert results == ["A", "hung: TimeoutError", "B", "C", "D"]
+    # The rest of the batch ran in the hung item's shadow, not after it
+    assert elapsed < 1.0
+
+
+def test_errors_are_replaced_per_item():
+    def fetch_one(item):
+        if item == "bad":
+            raise ValueError(item)
+        return item
+    assert fetch_concurrently(["ok", "bad"], fetch_one, on_error) == ["ok", "bad: ValueError"]
+
+
+def test_empty_batch():
+    assert fetch_concurrently([], str, on_error) == []
@@ -0,0 +1,184 @@
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+import pytest
+
+import market_provider
+import ohlc_store
+from ohlc_store import OhlcStore, _merge, _Series
+
+
+def bars(start, closes, freq="D", tz="UTC"):
+    index = pd.date_range(start, periods=len(closes), freq=freq, tz=tz).as_unit("ns")
+    return pd.DataFrame({"Open": closes, "High": closes, "Low": closes, "Close": closes, "Volume": closes},
+                        index=index, dtype=float)
+
+
+class FakeProvider(market_provider.MarketDataProvider):
+    """
+    Serves the slice of `frame` from the requested start and records every call.
+    """
+
+    name = "fake"
+
+    def __init__(self, frame):
+        self.frame = frame
+        self.calls = []
+        self.fail = False
+
+    def get_info(self, symbol):
+        return {}
+
+    def get_history(self, symbol, period="1mo", interval="1d"):
+        return self.frame
+
+    def get_history_since(self, symbol, start, interval="1d"):
+        self.calls.append(start)
+        if self.fail:
+            raise ConnectionError("upstream down")
+        return self.frame if start is None else self.frame[self.frame.index >= start]
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    today = pd.Timestamp.now(tz="UTC").normalize()
+    fake = FakeProvider(bars(today - timedelta(days=99), [float(i) for i in range(100)]))
+    previous = market_provider.get_provider()
+    market_provider.set_provider(fake)
+    yield fake
+    market_provider.set_provider(previous)
+
+
+def expire(store):
+    for series in store._series.values():
+        series.fetched_at -= ohlc_store.OHLC_DAILY_TTL + 1
+
+
+# --- _Series.covers ---
+
+def test_full_history_covers_every_start():
+    series = _Series(bars("2024-01-01", [1.0]), None, 0)
+    assert series.covers(None)
+    assert series.covers(0)
+
+
+def test_partial_history_covers_only_later_starts():
+    series = _Series(bars("2024-01-01", [1.0]), 1000.0, 0)
+    assert series.covers(1000.0)
+    assert series.covers(2000.0)
+    assert not series.covers(999.0)
+    assert not series.covers(None)
+
+
+# --- _merge ---
+
+def test_merge_with_nothing_stored_returns_fetched():
+    fetched = bars("2024-01-01", [1.0, 2.0])
+    assert _merge(None, fetched) is fetched
+    assert _merge(fetched.iloc[:0], fetched) is fetched
+
+
+def test_merge_with_nothing_fetched_keeps_stored():
+    stored = bars("2024-01-01", [1.0, 2.0])
+    assert _merge(stored, stored.iloc[:0]) is stored
+
+
+def test_merge_replaces_overlapping_bars_and_appends_new_ones():
+    stored = bars("2024-01-01", [1.0, 2.0, 3.0])
+    # The last stored bar was still forming; the tail fetch restates it
+    fetched = bars("2024-01-03", [3.5, 4.0])
+    merged = _merge(stored, fetched)
+    assert merged["Close"].tolist() == [1.0, 2.0, 3.5, 4.0]
+    assert merged.index.is_monotonic_increasing
+    assert not merged.index.has_duplicates
+
+
+def test_merge_keeps_the_stored_timezone():
+    stored = bars("2024-01-01", [1.0, 2.0], tz="America/New_York")
+    fetched = bars("2024-01-03 05:00", [3.0], tz="UTC")
+    merged = _merge(stored, fetched)
+    assert str(merged.index.tz) == "America/New_York"
+    assert merged["Close"].tolist() == [1.0, 2.0, 3.0]
+
+
+# --- OhlcStore._update ---
+
+def test_first_request_fetches_the_window_then_serves_from_memory(provider):
+    store = OhlcStore(path="")
+    first = store.get_bars("AAPL", "1M")
+    assert len(provider.calls) == 1 and provider.calls[0] is not None
+    assert len(first) > 20
+
+    store.get_bars("aapl", "1M")
+    assert len(provider.calls) == 1
+    assert store.stats()["full_fetches"] == 1
+    assert store.stats()["hits"] == 1
+
+
+def test_expired_series_fetches_only_the_tail(provider):
+    store = OhlcStore(path="")
+    stored = store.get_bars("AAPL", "1M")
+    last = stored.index[-1]
+
+    provider.frame = pd.concat([provider.frame.iloc[:-1], bars(last, [500.0, 501.0])])
+    expire(store)
+    updated = store.get_bars("AAPL", "1M")
+
+    assert provider.calls[-1] == datetime.fromtimestamp(last.timestamp(), tz=timezone.utc)
+    assert store.stats()["tail_fetches"] == 1
+    assert updated["Close"].iloc[-2:].tolist() == [500.0, 501.0]
+    assert updated.index[0] == stored.index[1]  # the window slid by the new bar
+    assert not updated.index.has_duplicates
+
+
+def test_longer_period_refetches_and_widens_coverage(provider):
+    store = OhlcStore(path="")
+    store.get_bars("AAPL", "1M")
+    narrow = store._series[("AAPL", "1d")].covered_from
+
+    store.get_bars("AAPL", "3M")
+    series = store._series[("AAPL", "1d")]
+    assert store.stats()["full_fetches"] == 2
+    assert series.covered_from < narrow
+
+    # 1M is now a slice of the wider series
+    store.get_bars("AAPL", "1M")
+    assert len(provider.calls) == 2
+
+
+def test_max_period_covers_every_later_window(provider):
+    store = OhlcStore(path="")
+    assert len(store.get_bars("AAPL", "MAX")) == 100
+    assert provider.calls == [None]
+    assert store._series[("AAPL", "1d")].covered_from is None
+
+    store.get_bars("AAPL", "1Y")
+    store.get_bars("AAPL", "1M")
+    assert len(provider.calls) == 1
+
+
+def test_failed_tail_fetch_serves_stored_bars(provider):
+    store = OhlcStore(path="")
+    stored = store.get_bars("AAPL", "1M")
+    provider.fail = True
+    expire(store)
+
+    assert store.get_bars("AAPL", "1M").equals(stored)
+    assert store.stats()["fetch_errors"] == 1
+
+
+def test_failed_first_fetch_raises(provider):
+    provider.fail = True
+    with pytest.raises(ConnectionError):
+        OhlcStore(path="").get_bars("AAPL", "1M")
+
+
+def test_restarted_store_resumes_from_its_last_stored_bar(provider, tmp_path):
+    path = str(tmp_path / "bars.sqlite3")
+    stored = OhlcStore(path=path).get_bars("AAPL", "1M")
+
+    restarted = OhlcStore(path=path)
+    restarted.get_bars("AAPL", "1M")
+    assert restarted.stats()["disk_loads"] == 1
+    assert restarted.stats()["tail_fetches"] == 1
+    assert provider.calls[-1] == datetime.fromtimestamp(stored.index[-1].timestamp(), tz=timezone.utc)
@@ -0,0 +1,31 @@
+import pytest
+
+from recommendation_engine import parse_amount
+
+
+@pytest.mark.parametrize("answer, amount", [
+    ("50k", 50_000.0),
+    ("50K", 50_000.0),
+    ("$50 k to start", 50_000.0),
+    ("1.5k", 1_500.0),
+    ("$50,000", 50_000.0),
+    ("50000 USD", 50_000.0),
+    ("1,200.50", 1_200.5),
+    (2500, 2_500.0),
+])
+def test_parses_amounts(answer, amount):
+    assert parse_amount(answer) == amount
+
+
+@pytest.mark.parametrize("answer, amount", [
+    ("50 kids", 50.0),
+    ("50 kg of gold", 50.0),
+    ("about 3 kinds of fund", 3.0),
+])
+def test_words_starting_with_k_are_not_thousands(answer, amount):
+    assert parse_amount(answer) == amount
+
+
+@pytest.mark.parametrize("answer", ["", None, "Not specified", "a lot"])
+def test_no_amount_is_none(answer):
+    assert parse_amount(answer) is None
@@ -0,0 +1,124 @@
+import pytest
+from werkzeug.datastructures import MultiDict
+
+from company_records import CompanyRecord
+from screener import ScreenerIndex, parse_screen_options
+
+
+def record(ticker, tier, cap_billion, sector="Technology", currency="USD", change=0.0,
+           price=50.0, low=0.0, high=100.0, name=None):
+    cap = None if cap_billion is None else cap_billion * 1e9
+    return CompanyRecord(name or f"{ticker} Inc", ticker, currency, cap, cap, tier, sector,
+                         1.0, price, change, low, high)
+
+
+DATABASES = {
+    "USA": {
+        "Large Cap": [record("AAPL", "Large Cap", 3000, change=1.5, price=90.0),
+                      record("JPM", "Large Cap", 500, sector="Financial Services", change=-0.5, price=10.0)],
+        "Mid Cap": [record("ETSY", "Mid Cap", 8, sector="Consumer Cyclical", change=4.0, price=None)],
+        "Small Cap": [record("TINY", "Small Cap", None, change=None)],
+    },
+    "INDIA": {
+        "Large Cap": [record("TCS.NS", "Large Cap", 150, currency="INR", change=-1.0, price=75.0)],
+    },
+}
+
+
+@pytest.fixture
+def index():
+    return ScreenerIndex(DATABASES)
+
+
+def screen(index, **overrides):
+    options = {"regions": [], "tiers": [], "currencies": [], "sectors": [], "ranges": {},
+               "sort": "market_cap", "descending": True, "limit": 50, "offset": 0}
+    options.update(overrides)
+    total, rows = index.screen(**options)
+    return total, [row["ticker"] for row in rows]
+
+
+# --- ScreenerIndex.screen ---
+
+def test_no_filters_lists_everything_largest_first(index):
+    assert len(index) == 5
+    # Missing market caps sort last whatever the direction
+    assert screen(index) == (5, ["AAPL", "JPM", "TCS.NS", "ETSY", "TINY"])
+    assert screen(index, descending=False)[1] == ["ETSY", "TCS.NS", "JPM", "AAPL", "TINY"]
+
+
+def test_categorical_filters_combine(index):
+    assert screen(index, regions=["USA"], tiers=["Large Cap"]) == (2, ["AAPL", "JPM"])
+    assert screen(index, currencies=["INR"])[1] == ["TCS.NS"]
+    assert screen(index, sectors=["financial services", "consumer cyclical"])[1] == ["JPM", "ETSY"]
+
+
+def test_unknown_filter_values_match_nothing(index):
+    assert screen(index, sectors=["utilities"]) == (0, [])
+    assert screen(index, regions=["EU"]) == (0, [])
+
+
+def test_ranges_are_inclusive_and_skip_missing_figures(index):
+    assert screen(index, ranges={"market_cap": (150e9, 500e9)})[1] == ["JPM", "TCS.NS"]
+    assert screen(index, ranges={"change": (-1.0, None)})[1] == ["AAPL", "JPM", "TCS.NS", "ETSY"]
+    # ETSY has no price, so no 52-week position
+    assert screen(index, ranges={"position_52w": (None, 80)})[1] == ["JPM", "TCS.NS", "TINY"]
+
+
+def test_sorts_and_pages(index):
+    assert screen(index, sort="change")[1] == ["ETSY", "AAPL", "JPM", "TCS.NS", "TINY"]
+    assert screen(index, sort="ticker", descending=False)[1] == ["AAPL", "ETSY", "JPM", "TCS.NS", "TINY"]
+    assert screen(index, sort="ticker", descending=False, limit=2, offset=1) == (5, ["ETSY", "JPM"])
+    assert screen(index, offset=10) == (5, [])
+
+
+def test_rows_carry_region_and_52w_position(index):
+    _, rows = index.screen([], [], ["INR"], [], {}, "market_cap", True, 10, 0)
+    assert rows[0]["region"] == "INDIA"
+    assert rows[0]["position_52w"] == 75.0
+    _, rows = index.screen([], ["Mid Cap"], [], [], {}, "market_cap", True, 10, 0)
+    assert rows[0]["position_52w"] is None
+
+
+def test_built_from_tracks_database_identity(index):
+    assert index.built_from(dict(DATABASES))
+    assert not index.built_from({**DATABASES, "USA": dict(DATABASES["USA"])})
+    assert not index.built_from({"USA": DATABASES["USA"]})
+
+
+def test_empty_index():
+    assert screen(ScreenerIndex({})) == (0, [])
+
+
+# --- parse_screen_options ---
+
+def test_parses_query_parameters():
+    options = parse_screen_options(MultiDict([
+        ("region", "usa,na"), ("region", "India"), ("tier", "large,mid_cap"), ("currency", "usd"),
+        ("sector", "Technology"), ("min_cap", "$2B"), ("max_cap", "750m"), ("min_change", "-1.5"),
+        ("sort", "Change"), ("limit", "10"), ("offset", "20"),
+    ]))
+    assert options == {
+        "regions": ["USA", "INDIA"],
+        "tiers": ["Large Cap", "Mid Cap"],
+        "currencies": ["USD"],
+        "sectors": ["technology"],
+        "ranges": {"market_cap": (2e9, 7.5e8), "change": (-1.5, None)},
+        "sort": "change",
+        "descending": True,
+        "limit": 10,
+        "offset": 20,
+    }
+
+
+def test_text_sorts_default_to_ascending():
+    assert parse_screen_options(MultiDict({"sort": "name"}))["descending"] is False
+
+
+@pytest.mark.parametrize("args", [
+    {"region": "MARS"}, {"tier": "huge"}, {"min_cap": "lots"}, {"min_change": "x"},
+    {"sort": "beta"}, {"order": "up"}, {"limit": "0"}, {"limit": "many"}, {"offset": "-1"},
+])
+def test_rejects_bad_parameters(args):
+    with pytest.raises(ValueError):
+        parse_screen_options(MultiDict(args))
@@ -0,0 +1,147 @@
+import json
+
+import pytest
+
+import symbol_resolver as resolver_module
+from market_provider import MarketDataNotFound
+from symbol_resolver import SymbolLookupUnavailable, SymbolResolver
+
+
+QUOTE = {"regularMarketPrice": 10.0}
+
+
+class FakeQuotes:
+    """
+    Stands in for quote_cache: symbols in `listed` have a quote, those in
+    `down` raise as an outage would, and everything else is not found.
+    """
+
+    def __init__(self, listed=(), down=()):
+        self.listed = set(listed)
+        self.down = set(down)
+        self.calls = []
+
+    def get_info(self, symbol):
+        self.calls.append(symbol)
+        if symbol in self.down:
+            raise ConnectionError("upstream down")
+        if symbol in self.listed:
+            return dict(QUOTE)
+        raise MarketDataNotFound(symbol)
+
+
+@pytest.fixture
+def quotes(monkeypatch):
+    fake = FakeQuotes()
+    monkeypatch.setattr(resolver_module, "quote_cache", fake)
+    return fake
+
+
+@pytest.fixture
+def resolver(tmp_path):
+    resolver = SymbolResolver(str(tmp_path / "symbol_cache.json"))
+    resolver._listings = {"TCS": ["TCS.NS"], "TCS.NS": ["TCS.NS"]}
+    return resolver
+
+
+def saved(resolver):
+    with open(resolver.cache_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_listed_ticker_resolves_and_is_saved(resolver, quotes):
+    quotes.listed = {"TCS.NS"}
+    assert resolver.resolve("tcs") == ("TCS.NS", QUOTE)
+    assert saved(resolver) == {"TCS": "TCS.NS"}
+
+
+def test_positive_cache_asks_only_the_remembered_symbol(resolver, quotes):
+    quotes.listed = {"SAP.DE"}
+    assert resolver.resolve("SAP")[0] == "SAP.DE"
+    quotes.calls.clear()
+
+    assert SymbolResolver(resolver.cache_path)._resolved == {"SAP": "SAP.DE"}
+    assert resolver.resolve("SAP")[0] == "SAP.DE"
+    assert quotes.calls == ["SAP.DE"]
+
+
+def test_unlisted_fan_out_only_follows_a_us_miss(resolver, quotes):
+    quotes.listed = {"AAPL"}
+    assert resolver.resolve("AAPL")[0] == "AAPL"
+    assert quotes.calls == ["AAPL"]
+
+
+def test_unlisted_fan_out_is_configurable(resolver, quotes, monkeypatch):
+    monkeypatch.setattr(resolver_module, "UNLISTED_SUFFIXES", [".L"])
+    assert resolver.candidate_stages("VOD") == [["VOD"], ["VOD.L"]]
+    monkeypatch.setattr(resolver_module, "UNLISTED_SUFFIXES", [])
+    assert resolver.candidate_stages("VOD") == [["VOD"]]
+
+
+def test_index_symbols_are_looked_up_without_suffixes(resolver, quotes):
+    quotes.listed = {"^GSPC"}
+    assert resolver.candidate_stages("^GSPC") == [["^GSPC"]]
+    assert resolver.resolve("^gspc")[0] == "^GSPC"
+
+
+@pytest.mark.parametrize("ticker", ["", "AA PL", "^", "^^GSPC", "A" * 20, "../ETC"])
+def test_implausible_tickers_are_rejected_without_a_lookup(resolver, quotes, ticker):
+    with pytest.raises(LookupError):
+        resolver.resolve(ticker)
+    assert quotes.calls == []
+
+
+def test_negative_cache_skips_upstream_within_the_ttl(resolver, quotes, monkeypatch):
+    with pytest.raises(LookupError):
+        resolver.resolve("NOPE")
+    assert len(quotes.calls) == 1 + len(resolver_module.UNLISTED_SUFFIXES)
+    quotes.calls.clear()
+
+    with pytest.raises(LookupError):
+        resolver.resolve("NOPE")
+    assert quotes.calls == []
+
+    # Once the entry expires the ticker is looked up again
+    monkeypatch.setattr(resolver_module, "NEGATIVE_TTL", 0)
+    quotes.listed = {"NOPE"}
+    assert resolver.resolve("NOPE")[0] == "NOPE"
+    assert "NOPE" not in resolver._unknown
+
+
+def test_negative_cache_is_capped(resolver, quotes, monkeypatch):
+    monkeypatch.setattr(resolver_module, "MAX_UNKNOWN", 2)
+    monkeypatch.setattr(resolver_module, "UNLISTED_SUFFIXES", [])
+    for ticker in ("AAA", "BBB", "CCC"):
+        with pytest.raises(LookupError):
+            resolver.resolve(ticker)
+    assert list(resolver._unknown) == ["BBB", "CCC"]
+
+
+def test_outage_is_unavailable_and_keeps_the_mapping(resolver, quotes):
+    quotes.listed = {"TCS.NS"}
+    resolver.resolve("TCS")
+    quotes.down = {"TCS.NS", "TCS.BO"}
+    quotes.calls.clear()
+
+    with pytest.raises(SymbolLookupUnavailable):
+        resolver.resolve("TCS")
+    assert resolver._resolved == {"TCS": "TCS.NS"}
+    assert saved(resolver) == {"TCS": "TCS.NS"}
+    assert "TCS" not in resolver._unknown
+
+    # Nothing was cached negatively, so recovery is immediate
+    quotes.down = set()
+    assert resolver.resolve("TCS")[0] == "TCS.NS"
+
+
+def test_partial_outage_is_not_evidence_a_ticker_is_unlisted(resolver, quotes):
+    quotes.down = {"NOPE.L"}
+    with pytest.raises(SymbolLookupUnavailable):
+        resolver.resolve("NOPE")
+    assert "NOPE" not in resolver._unknown
+
+
+def test_suffix_fallback_takes_over_a_dead_listing(resolver, quotes):
+    quotes.listed = {"TCS.BO"}
+    assert resolver.resolve("TCS")[0] == "TCS.BO"
+    assert saved(resolver) == {"TCS": "TCS.BO"}
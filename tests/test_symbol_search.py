@@ -0,0 +1,99 @@
+import pytest
+
+from symbol_search import SymbolSearchIndex, fold, name_key
+
+
+def listing(ticker, name, region="USA"):
+    return {"ticker": ticker, "name": name, "region": region, "exchange": "X", "currency": "USD"}
+
+
+LISTINGS = [
+    listing("MC.PA", "LVMH Moët Hennessy - Louis Vuitton SE", "EU"),
+    listing("META", "Meta Platforms, Inc."),
+    listing("MET", "MetLife, Inc."),
+    listing("AMAT", "Applied Materials, Inc."),
+    listing("MELI", "MercadoLibre, Inc."),
+    listing("NESN.SW", "Nestlé S.A.", "EU"),
+    listing("TCS.NS", "Tata Consultancy Services Limited", "INDIA"),
+    listing("M", "Macy's, Inc."),
+]
+
+
+@pytest.fixture
+def index():
+    return SymbolSearchIndex(LISTINGS)
+
+
+def tickers(results):
+    return [result["ticker"] for result in results]
+
+
+# --- fold / name_key ---
+
+def test_fold_ignores_case_and_accents():
+    assert fold("Moët") == fold("MOET") == "moet"
+    assert fold("  Nestlé ") == "nestle"
+
+
+def test_name_key_keeps_only_words():
+    assert name_key("LVMH Moët Hennessy - Louis Vuitton SE") == "lvmh moet hennessy louis vuitton se"
+    assert name_key("Macy's, Inc.") == "macy s inc"
+    assert name_key("---") == ""
+
+
+# --- SymbolSearchIndex.search ---
+
+def test_ranking_puts_the_exact_ticker_first(index):
+    # Exact ticker, other tickers starting with "met", then names starting with it
+    assert tickers(index.search("met")) == ["MET", "META"]
+    assert tickers(index.search("me")) == ["MELI", "MET", "META"]
+    assert tickers(index.search("m"))[0] == "M"
+
+
+def test_ticker_prefixes_rank_before_name_matches(index):
+    # Macy's name and AMAT's "Materials" match too, but after every ticker
+    assert tickers(index.search("m")) == ["M", "MC.PA", "MELI", "MET", "META", "AMAT"]
+
+
+def test_later_words_of_names_match(index):
+    assert tickers(index.search("hennessy louis")) == ["MC.PA"]
+    assert tickers(index.search("consultancy")) == ["TCS.NS"]
+    assert tickers(index.search("materials")) == ["AMAT"]
+
+
+def test_name_prefixes_rank_before_later_words(index):
+    # "Macy's" by its first word, "Applied Materials" only by a later one
+    assert tickers(index.search("ma")) == ["M", "AMAT"]
+    assert tickers(index.search("metlife")) == ["MET"]
+
+
+def test_search_is_accent_and_case_insensitive(index):
+    assert tickers(index.search("Moët")) == tickers(index.search("MOET")) == ["MC.PA"]
+    assert tickers(index.search("nestle")) == ["NESN.SW"]
+    assert tickers(index.search("NESTLÉ S.A.")) == ["NESN.SW"]
+
+
+def test_exchange_suffixed_tickers_are_found_by_prefix(index):
+    assert tickers(index.search("tcs")) == ["TCS.NS"]
+    assert tickers(index.search("tcs.ns")) == ["TCS.NS"]
+
+
+@pytest.mark.parametrize("limit", [0, 1, 2, 3])
+def test_limit_caps_results_in_rank_order(index, limit):
+    assert tickers(index.search("me", limit)) == ["MELI", "MET", "META"][:limit]
+
+
+def test_each_listing_appears_once(index):
+    # META matches by ticker and by name
+    results = tickers(index.search("meta", 10))
+    assert results == ["META"]
+
+
+@pytest.mark.parametrize("query", ["", "   ", "zzz", "-"])
+def test_no_match(index, query):
+    assert index.search(query) == []
+
+
+def test_results_are_the_listings(index):
+    assert index.search("tcs")[0] is LISTINGS[6]
+    assert len(index) == len(LISTINGS)
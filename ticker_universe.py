@@ -0,0 +1,121 @@
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+# --- Configuration for Ticker Universes ---
+
+# Directory holding one <file>.parquet or <file>.csv per region (the file
+# name is set per region in region_engine.REGIONS). A single region can be
+# pointed elsewhere with FINVISER_UNIVERSE_<REGION>.
+UNIVERSE_DIR = os.getenv(
+    "FINVISER_UNIVERSE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "universes"),
+)
+
+UNIVERSE_COLUMNS = ['ticker', 'name', 'region', 'exchange', 'currency', 'sector']
+
+
+class TickerUniverse:
+    """
+    The listed companies of one region, indexed by ticker, name and sector.
+    Rows keep the order of the source file.
+    """
+
+    def __init__(self, frame: pd.DataFrame):
+        missing = [c for c in UNIVERSE_COLUMNS if c not in frame.columns]
+        if missing:
+            raise ValueError(f"Ticker universe is missing columns: {', '.join(missing)}")
+
+        frame = frame[UNIVERSE_COLUMNS].fillna('').astype(str)
+        frame = frame.apply(lambda column: column.str.strip())
+        frame['ticker'] = frame['ticker'].str.upper()
+        frame = frame[frame['ticker'] != ''].drop_duplicates('ticker').reset_index(drop=True)
+        self.frame = frame
+
+        positions = np.arange(len(frame))
+        self._by_ticker: Dict[str, int] = dict(zip(frame['ticker'], positions))
+        self._by_name: Dict[str, int] = dict(zip(frame['name'].str.lower().str.split().str.join(" "), positions))
+        self._by_sector: Dict[str, np.ndarray] = {
+            sector: np.asarray(rows) for sector, rows in frame.groupby(frame['sector'].str.lower()).indices.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker.upper() in self._by_ticker
+
+    def companies(self) -> List[Tuple[str, str]]:
+        """(name, ticker) pairs in file order, as fed to the fetch path."""
+        return list(zip(self.frame['name'], self.frame['ticker']))
+
+    def company_map(self) -> Dict[str, str]:
+        """Company name -> ticker, the shape of the old hardcoded COMPANY_MAP."""
+        return dict(self.companies())
+
+    def lookup(self, ticker: str) -> Optional[Dict[str, str]]:
+        position = self._by_ticker.get(ticker.upper())
+        return None if position is None else self.frame.iloc[position].to_dict()
+
+    def find_name(self, name: str) -> Optional[Dict[str, str]]:
+        position = self._by_name.get(" ".join(name.lower().split()))
+        return None if position is None else self.frame.iloc[position].to_dict()
+
+    def in_sector(self, sector: str) -> pd.DataFrame:
+        rows = self._by_sector.get(sector.lower(), np.empty(0, dtype=int))
+        return self.frame.iloc[rows]
+
+    def sectors(self) -> List[str]:
+        return sorted(self.frame['sector'].unique())
+
+    def fill_listing_fields(self, raw: pd.DataFrame) -> pd.DataFrame:
+        """
+        Fills the currency and sector the provider left empty in raw fetch
+        rows from the listing file, matching on Ticker.
+        """
+        listed = self.frame.set_index('ticker')
+        tickers = raw['Ticker'].str.upper()
+        filled = raw.copy()
+        for column in ('currency', 'sector'):
+            listing = tickers.map(listed[column]).replace('', np.nan)
+            filled[column] = filled[column].fillna(listing) if column in filled else listing
+        return filled
+
+
+def load_universe(path: str) -> TickerUniverse:
+    """
+    Reads a universe from CSV or Parquet (Parquet needs pyarrow installed).
+    """
+    if path.endswith(".parquet"):
+        frame = pd.read_parquet(path)
+    else:
+        frame = pd.read_csv(path, dtype=str, keep_default_na=False, encoding="utf-8")
+    return TickerUniverse(frame)
+
+
+def universe_path(region: str, file_name: Optional[str] = None) -> str:
+    override = os.getenv(f"FINVISER_UNIVERSE_{region}")
+    if override:
+        return override
+    base = os.path.join(UNIVERSE_DIR, file_name or region.lower())
+    parquet = base + ".parquet"
+    return parquet if os.path.exists(parquet) else base + ".csv"
+
+
+_universes: Dict[str, TickerUniverse] = {}
+_lock = threading.Lock()
+
+
+def get_universe(region: str, file_name: Optional[str] = None) -> TickerUniverse:
+    """
+    Returns the region's universe, loading it from disk on first use.
+    """
+    with _lock:
+        universe = _universes.get(region)
+        if universe is None:
+            universe = _universes[region] = load_universe(universe_path(region, file_name))
+        return universe